@@ -1,18 +1,24 @@
 from PyQt6.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsTextItem, QInputDialog
 from PyQt6.QtGui import QBrush
 from PyQt6.QtCore import Qt
+from network_model import node_field, node_lines
 
 class Bus(QGraphicsRectItem):
-    def __init__(self, x, y, name="Bus", voltage=1.0, angle=0, width=40, height=20):
+    """ View of bus `index` in a NetworkModel; attributes read and write the model arrays """
+    voltage = node_field("voltage")
+    angle = node_field("angle")
+    lines = node_lines()  # Connected lines
+
+    def __init__(self, model, index):
+        width, height = model.width[index].item(), model.height[index].item()
         super().__init__(-width / 2, -height / 2, width, height)  # Set rectangle size
-        self.setPos(x, y)
+        self.model = model
+        self.index = index
+        self.name = model.node_names[index]
+        self.setPos(model.x[index], model.y[index])
         self.setBrush(QBrush(Qt.GlobalColor.blue))
         self.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsMovable | 
                       QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
-        self.name = name
-        self.voltage = voltage
-        self.angle = angle
-        self.lines = []  # Store connected lines
 
         self.text = QGraphicsTextItem(self.name, self)
         self.text.setPos(-width / 2 + 5, -height / 2 - 15)
@@ -23,7 +29,7 @@ class Bus(QGraphicsRectItem):
                                            "Enter Voltage (p.u.):", 
                                            self.voltage, 0, 10, 2)
         if ok:
-            self.voltage = value
+            self.scene().edit(self, "voltage", value)
 
     def mouseMoveEvent(self, event):
         """ Update lines when moving the bus """
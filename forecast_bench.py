@@ -0,0 +1,102 @@
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+
+
+async def request(reader, writer, host, body):
+    """ One keep-alive POST /forecast, returns (status, payload) """
+    data = json.dumps(body).encode()
+    writer.write(
+        f"POST /forecast HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def fetch_metrics(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def client(host, port, deadline, make_body, latencies, failures):
+    """ A single connection issuing requests back to back until the deadline """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, payload = await request(reader, writer, host, make_body())
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                failures.append(payload.get("error", status))
+    finally:
+        writer.close()
+
+
+async def run(args):
+    start = datetime.fromisoformat(args.start)
+    kinds = args.kinds.split(",")
+
+    def make_body():
+        # Spread requests over a number of distinct windows to control the cache hit rate
+        offset = random.randrange(args.distinct)
+        return {"kind": random.choice(kinds), "model": args.model, "hours": args.hours,
+                "start": (start + timedelta(hours=offset)).isoformat()}
+
+    latencies, failures = [], []
+    before = await fetch_metrics(args.host, args.port)
+    began = time.perf_counter()
+    deadline = began + args.duration
+    await asyncio.gather(*(client(args.host, args.port, deadline, make_body, latencies, failures)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - began
+    after = await fetch_metrics(args.host, args.port)
+
+    latency_ms = np.array(latencies) * 1000.0
+    print(f"{len(latencies)} requests in {elapsed:.1f} s with {args.concurrency} connections "
+          f"-> {len(latencies) / elapsed:.0f} req/s, {len(failures)} failed")
+    if len(latency_ms):
+        p50, p95, p99 = np.percentile(latency_ms, [50, 95, 99])
+        print(f"Latency ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {latency_ms.max():.2f}")
+    batches = after["batches"] - before["batches"]
+    hits = after["cache_hits"] - before["cache_hits"]
+    predicted = after["requests"] - before["requests"] - hits
+    print(f"Server: {hits} cache hits, {batches} predict calls for {predicted} misses "
+          f"({predicted / max(batches, 1):.1f} requests per call)")
+    if failures:
+        print(f"First failure: {failures[0]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for forecast_service.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=64, help="Open connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--model", default="xgboost")
+    parser.add_argument("--kinds", default="load,solar,wind")
+    parser.add_argument("--start", default=datetime.now().strftime("%Y-%m-%dT00:00"))
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--distinct", type=int, default=144,
+                        help="Distinct start hours requested; lower means more cache hits")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import OrderedDict, deque
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+
+WEATHER_FILE = "weather.csv"
+MODEL_KEYS = ("xgboost", "random_forsest", "neural_network")
+KINDS = ("load", "solar", "wind")
+MAX_HOURS = 24 * 14
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class LRUCache:
+    """ Small ordered-dict LRU, values are whatever the caller stores """
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def pop(self, key):
+        self.items.pop(key, None)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for one model into a single predict call.
+
+    The first queued request opens a batch. Requests that arrive within
+    max_wait seconds, up to max_batch of them, join it. Their feature frames
+    are concatenated, predicted once in the executor and split back per
+    request. While a batch runs, the next one fills up, so heavier load gives
+    larger batches without adding latency. If a merged batch fails, each
+    request is retried on its own so one bad frame fails only its request.
+    """
+
+    def __init__(self, predict, max_batch=64, max_wait=0.005, metrics=None):
+        self.predict = predict  # frames -> list of arrays, runs off the event loop
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.metrics = metrics
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def submit(self, frame):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((frame, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            frames = [frame for frame, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.predict, frames)
+            except Exception as e:
+                if len(batch) == 1:
+                    self.resolve(batch[0][1], error=e)
+                else:
+                    await self.run_separately(batch)
+                continue
+            if self.metrics is not None:
+                self.metrics.record_batch(len(batch))
+            for (_, future), result in zip(batch, results):
+                self.resolve(future, result)
+
+    async def run_separately(self, batch):
+        """ Predict each request of a failed batch alone to isolate the bad ones """
+        loop = asyncio.get_running_loop()
+        for frame, future in batch:
+            try:
+                result = (await loop.run_in_executor(None, self.predict, [frame]))[0]
+            except Exception as e:
+                self.resolve(future, error=e)
+                continue
+            if self.metrics is not None:
+                self.metrics.record_batch(1)
+            self.resolve(future, result)
+
+    @staticmethod
+    def resolve(future, result=None, error=None):
+        if future.done():
+            return  # The request was cancelled, e.g. its client went away
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def close(self):
+        self.task.cancel()
+
+
+class ServiceMetrics:
+    """ Request latency percentiles, throughput and cache/batch counters """
+
+    WINDOW = 60.0  # Seconds of history used for the throughput figure
+
+    def __init__(self, history=10000):
+        self.started = time.monotonic()
+        self.latencies = deque(maxlen=history)
+        self.completed = deque()
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record_request(self, latency, error=False):
+        now = time.monotonic()
+        self.requests += 1
+        self.errors += error
+        self.latencies.append(latency)
+        self.completed.append(now)
+        while self.completed and self.completed[0] < now - self.WINDOW:
+            self.completed.popleft()
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+
+    def snapshot(self):
+        now = time.monotonic()
+        window = min(self.WINDOW, now - self.started) or 1.0
+        recent = sum(1 for t in self.completed if t >= now - self.WINDOW)
+        latencies = np.array(self.latencies) * 1000.0
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+        return {
+            "uptime_s": round(now - self.started, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(recent / window, 1),
+            "latency_ms": {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2),
+                           "max": round(float(latencies.max()), 2) if len(latencies) else 0.0},
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.requests, 3) if self.requests else 0.0,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class ForecastService:
+    """
+    Serves load, solar and wind forecasts from the model registry.
+
+    Feature frames are built once per (kind, start, hours) and kept in an LRU
+    cache, predictions are micro-batched per model and finished results are
+    cached too. Concurrent identical requests share one in-flight future.
+    Both caches are keyed on the modification time of weather.csv, so a
+    weather refresh invalidates them without a restart.
+
+    Parameters:
+    - max_batch (int): Largest number of requests merged into one predict call.
+    - max_wait (float): Seconds a batch stays open for more requests.
+    - cache_size (int): Entries kept in each of the feature and result caches.
+    """
+
+    def __init__(self, max_batch=64, max_wait=0.005, cache_size=1024):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.features = LRUCache(cache_size)
+        self.results = LRUCache(cache_size)  # key -> future of the forecast list
+        self.batchers = {}
+        self.metrics = ServiceMetrics()
+        self.models = None
+
+    def registry(self):
+        if self.models is None:
+            import models  # Unpickles every forecast model once
+            self.models = models
+        return self.models
+
+    def batcher(self, model_name):
+        if model_name not in self.batchers:
+            predict = self.registry().predict_load if model_name.startswith("load_") else self.registry().predict_generation
+
+            def predict_batch(frames):
+                import pandas as pd
+                prediction = predict(model_name, pd.concat(frames, ignore_index=True))
+                if prediction is None:
+                    raise RuntimeError(f"Prediction with {model_name} failed, see server log")
+                return np.split(np.asarray(prediction), np.cumsum([len(f) for f in frames])[:-1])
+
+            self.batchers[model_name] = MicroBatcher(predict_batch, self.max_batch, self.max_wait, self.metrics)
+        return self.batchers[model_name]
+
+    def build_features(self, kind, start, hours):
+        from process_data import process_data_load, process_data_generation, is_solar
+        if kind == "load":
+            return process_data_load(start, hours)
+        frame = process_data_generation(start, hours)
+        return is_solar(frame) if kind == "solar" else frame
+
+    async def feature_frame(self, kind, start, hours, version):
+        key = (kind, start, hours, version)
+        frame = self.features.get(key)
+        if frame is None:
+            frame = await asyncio.get_running_loop().run_in_executor(None, self.build_features, kind, start, hours)
+            self.features.put(key, frame)
+        return frame
+
+    async def forecast(self, kind, model_key, start, hours):
+        """
+        Forecast one kind over [start, start + hours).
+
+        Returns:
+        - tuple(list, bool): Hourly MW values and whether they came from the cache.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}")
+        if model_key not in MODEL_KEYS:
+            raise ValueError(f"model must be one of {MODEL_KEYS}")
+        if not 1 <= hours <= MAX_HOURS:
+            raise ValueError(f"hours must be between 1 and {MAX_HOURS}")
+
+        version = os.path.getmtime(WEATHER_FILE)
+        key = (kind, model_key, start, hours, version)
+        future = self.results.get(key)
+        if future is not None:
+            try:
+                values = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This request was cancelled, not the shared one
+                # The request computing it went away, compute it here instead
+            else:
+                self.metrics.cache_hits += 1
+                return values, True
+
+        future = asyncio.get_running_loop().create_future()
+        self.results.put(key, future)
+        try:
+            frame = await self.feature_frame(kind, start, hours, version)
+            if len(frame) != hours:
+                raise ValueError(f"{WEATHER_FILE} covers {len(frame)} of the {hours} hours requested from {start}")
+            model_name = f"{'load' if kind == 'load' else 'gen'}_{model_key}"
+            values = (await self.batcher(model_name).submit(frame)).tolist()
+            future.set_result(values)
+        except BaseException as e:
+            if self.results.get(key) is future:
+                self.results.pop(key)  # Do not cache failures
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()  # Waiters then compute the forecast themselves
+            else:
+                future.set_exception(e)
+                future.exception()  # Waiters re-raise it; mark it retrieved
+            raise
+        return values, False
+
+    async def route(self, method, target, body):
+        """ Dispatch one request, returns (status, payload) """
+        url = urlsplit(target)
+        if url.path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if url.path == "/health":
+            return 200, {"status": "ok"}
+        if url.path != "/forecast":
+            return 404, {"error": f"Unknown path {url.path}"}
+
+        if method == "GET":
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        elif method == "POST":
+            params = json.loads(body or b"{}")
+        else:
+            return 405, {"error": "Use GET or POST"}
+        if not isinstance(params, dict):
+            return 400, {"error": "Expected a JSON object"}
+
+        started = time.perf_counter()
+        try:
+            start = datetime.fromisoformat(str(params["start"])).isoformat()
+            kind, model_key, hours = params.get("kind", "load"), params.get("model", "xgboost"), int(params.get("hours", 24))
+            values, cached = await self.forecast(kind, model_key, start, hours)
+        except (KeyError, ValueError, TypeError) as e:
+            self.metrics.record_request(time.perf_counter() - started, error=True)
+            return 400, {"error": f"Bad request: {e}"}
+        except Exception as e:
+            self.metrics.record_request(time.perf_counter() - started, error=True)
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        self.metrics.record_request(time.perf_counter() - started)
+        return 200, {"kind": kind, "model": model_key, "start": start, "hours": hours,
+                     "values": values, "cached": cached}
+
+    async def handle(self, reader, writer):
+        """ Minimal HTTP/1.1 with keep-alive, enough for local JSON clients """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                try:
+                    status, payload = await self.route(method, target, body)
+                except json.JSONDecodeError as e:
+                    status, payload = 400, {"error": f"Invalid JSON: {e}"}
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        # Unpickle the models before listening, off the event loop
+        print("Loading forecast models...")
+        await asyncio.get_running_loop().run_in_executor(None, self.registry)
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Forecast service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve load and generation forecasts over local HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=64, help="Most requests merged into one predict call")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="How long a batch waits for more requests")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    service = ForecastService(args.max_batch, args.max_wait_ms / 1000.0, args.cache_size)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,60 +1,281 @@
-from PyQt6.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QMainWindow, QLabel
-from PyQt6.QtGui import QPainter, QIcon, QPixmap, QFont
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QGraphicsItem, QMainWindow, QLabel, QFileDialog
+from PyQt6.QtGui import QPainter, QIcon, QPixmap, QFont, QKeySequence, QShortcut, QBrush
+from PyQt6.QtCore import Qt, QTimer
 from sld_data import bus_data, line_data, source_data, load_data
+from scene_io import CommandJournal, load_scene, save_scene
+from live_flow import LiveAnalysis
+from fault_analysis import level_colour
+from worker import OptimizationWorker
+from network_model import NetworkModel, BUS, SOURCE, LOAD
 from bus import Bus
 from line import Line
 from load import Load
 from source import Source
 import sys
 
+FAULT_FIELDS = ("impedance", "in_service", "voltage")  # Edits that change fault levels
+
 class SLDCanvas(QGraphicsScene):
-    def __init__(self):
+    def __init__(self, path=None, attach_journal=True):
         super().__init__()
         self.setSceneRect(0, 0, 800, 600)
+        self.model = None  # NetworkModel holding the state the items display
+        self.nodes = []  # Node views by model node id
         self.buses = {}
-        self.lines = []
+        self.lines = {}  # Line views by model branch id
+        self.removed_lines = {}  # Views of out-of-service branches, kept for undo
         self.loads = {}
         self.sources = {}
+        self.journal = CommandJournal(self)
+        self.analysis = None  # LiveAnalysis while live mode is on
+        self.faults_shown = False
+        self.fault_info = {}  # (MVA, p.u. current) by bus node id while fault levels are shown
+        self.worker = None  # OptimizationWorker solving fault studies, set by the view
+        self.fault_job = None  # Id of the fault study whose result will be shown
+        self.fault_timer = QTimer(self)
+        self.fault_timer.setSingleShot(True)
+        self.fault_timer.setInterval(0)
+        self.fault_timer.timeout.connect(self.request_fault_levels)
+        self.drag_start = {}
+
+        if path:
+            # Without attach_journal the snapshot and journal are only read, never written
+            load_scene(self, path, attach_journal)
+        else:
+            # Create example buses and lines
+            self.build_views(NetworkModel.from_sld_data(bus_data, source_data, load_data, line_data))
+
+    def build_views(self, model):
+        """ Create one graphics item per model node and in-service branch """
+        self.model = model
+        views = {BUS: (Bus, self.buses), SOURCE: (Source, self.sources), LOAD: (Load, self.loads)}
+
+        # Skip BSP maintenance while bulk inserting, rebuild the index once at the end
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        for index, kind in enumerate(model.kind.tolist()):
+            view, table = views[kind]
+            item = view(model, index)
+            self.addItem(item)
+            self.nodes.append(item)
+            table[item.name] = item
+        for index in model.in_service_branches().tolist():
+            self.add_line_view(index)
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+
+    def add_line_view(self, index):
+        model = self.model
+        line = Line(model, index, self.nodes[model.from_node[index]], self.nodes[model.to_node[index]])
+        self.addItem(line)
+        self.lines[index] = line
+        return line
+
+    def edit(self, item, field, value):
+        """ Change an item attribute through the journal so it can be undone """
+        self.journal.execute([(item, field, getattr(item, field), value)])
+
+    def item_changed(self, item, field):
+        """ Forward an applied edit to the live analysis and re-run a shown fault study """
+        if self.analysis:
+            self.analysis.item_changed(item, field)
+        if self.faults_shown and field in FAULT_FIELDS:
+            self.clear_fault_levels()
+            self.fault_timer.start()  # One study per event-loop pass of edits
+
+    def set_live_analysis(self, enabled):
+        if self.analysis and not enabled:
+            self.analysis.clear()
+        self.analysis = LiveAnalysis(self) if enabled else None
+        self.update_bus_tooltips()
+
+    def update_bus_tooltips(self):
+        """ Bus tooltips from the live solution and the fault levels, whichever are shown """
+        live = self.analysis is not None and self.analysis.solved
+        for bus in self.buses.values():
+            parts = [f"{bus.voltage:.2f} p.u. / {bus.angle:.2f} deg"] if live else []
+            if bus.index in self.fault_info:
+                parts.append("3-phase fault {:.0f} MVA ({:.2f} p.u.)".format(*self.fault_info[bus.index]))
+            bus.setToolTip(f"{bus.name}: {', '.join(parts)}" if parts else "")
+
+    def show_fault_levels(self, enabled, worker=None):
+        """
+        Colour buses by three-phase fault level, green lowest to red highest.
+
+        The study runs as a job on the analysis worker; buses are coloured
+        by apply_fault_levels() when its result arrives.
+        """
+        self.fault_timer.stop()
+        self.fault_job = None
+        self.clear_fault_levels()
+        self.faults_shown = False
+        if not enabled:
+            return
+        if not self.buses:
+            print("Fault analysis skipped: the network has no buses")
+            return
+        self.worker = worker or self.worker
+        self.faults_shown = True
+        self.request_fault_levels()
+
+    def request_fault_levels(self):
+        """ Send the current network to the worker, superseding any study still running """
+        self.fault_job = self.worker.submit("fault_levels", model=self.model)
+        if self.fault_job is None:
+            self.faults_shown = False
+
+    def apply_fault_levels(self, job_id, nodes, current, level):
+        """ Colour buses from a finished study, returns False for a superseded one """
+        if not self.faults_shown or job_id != self.fault_job:
+            return False
+        self.fault_job = None
+        low = level.min()
+        span = (level.max() - low) or 1.0
+        for node, i_pu, mva in zip(nodes.tolist(), current.tolist(), level.tolist()):
+            self.nodes[node].setBrush(QBrush(level_colour((mva - low) / span)))
+            self.fault_info[node] = (mva, i_pu)
+        self.update_bus_tooltips()
+        return True
+
+    def clear_fault_levels(self):
+        self.fault_info = {}
+        for bus in self.buses.values():
+            bus.setBrush(QBrush(Qt.GlobalColor.blue))
+        self.update_bus_tooltips()
 
-        # Create example buses and lines
-        for data in bus_data:
-            bus = Bus(data["x"], data["y"], data["name"], data["voltage"], data["angle"], data["width"], data["height"])
-            self.addItem(bus)
-            self.buses[data["name"]] = bus
-        
-        for data in source_data:
-            source = Source(data["x"], data["y"], data["voltage"], data["name"])
-            self.addItem(source)
-            self.sources[data["name"]] = source
-        
-        for data in load_data:
-            load = Load(data["x"], data["y"], data["power"], data["name"])
-            self.addItem(load)
-            self.loads[data["name"]] = load
-     
-        for data in line_data:
-            item1 = self.buses.get(data["item1"]) or self.sources.get(data["item1"]) or self.loads.get(data["item1"])
-            item2 = self.buses.get(data["item2"]) or self.sources.get(data["item2"]) or self.loads.get(data["item2"])
-
-            if item1 and item2:
-                print(f"Connecting {item1.name} to {item2.name}")
-                line = Line(data["name"], item1, item2, data["impedance"], data["is_directed"])
+    def add_line(self, item1, item2, impedance=0.1, name=""):
+        """ Connect two items with a new line as an undoable command """
+        index = int(self.model.add_branches([name], [item1.index], [item2.index], impedance, True)[0])
+        line = self.add_line_view(index)
+        self.journal.record_add(index)
+        self.journal.execute([(line, "in_service", False, True)])
+        return line
+
+    def remove_lines(self, lines):
+        """ Take lines out of service as one undoable command; branch ids stay reserved """
+        if lines:
+            self.journal.execute([(line, "in_service", True, False) for line in lines])
+
+    def set_in_service(self, index, in_service):
+        """ Show or hide the view of a branch as it enters or leaves service """
+        self.model.set_in_service(index, in_service)
+        if in_service and index not in self.lines:
+            line = self.removed_lines.pop(index, None)
+            if line is None:
+                self.add_line_view(index)
+            else:
                 self.addItem(line)
-                self.lines.append(line)
+                self.lines[index] = line
+                line.updatePosition()
+        elif not in_service and index in self.lines:
+            line = self.lines.pop(index)
+            self.removeItem(line)
+            self.removed_lines[index] = line
+
+    def mousePressEvent(self, event):
+        super().mousePressEvent(event)
+        # Remember where the (possibly several) selected items started
+        self.drag_start = {item: (item.pos().x(), item.pos().y()) for item in self.selectedItems()
+                           if item.flags() & QGraphicsItem.GraphicsItemFlag.ItemIsMovable}
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        # Record a finished drag as one undoable move of every item that moved
+        changes = [(item, "pos", start, (item.pos().x(), item.pos().y()))
+                   for item, start in self.drag_start.items()
+                   if start != (item.pos().x(), item.pos().y())]
+        self.drag_start = {}
+        if changes:
+            self.journal.execute(changes)
 
 class SLDApp(QGraphicsView):
-    def __init__(self):
+    def __init__(self, path=None):
         super().__init__()
-        self.setScene(SLDCanvas())
+        self.path = path
+        self.setScene(SLDCanvas(path))
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
         self.setWindowTitle("SCOPF Tool")
         self.resize(820, 620)
         self.setWindowIcon(QIcon("icon.webp"))
+        self.worker = None  # Analysis worker, started by the first fault study
+
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=lambda: self.scene().journal.undo())
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=lambda: self.scene().journal.redo())
+        QShortcut(QKeySequence.StandardKey.Save, self, activated=self.save)
+        QShortcut(QKeySequence.StandardKey.Open, self, activated=self.open)
+        QShortcut(QKeySequence(Qt.Key.Key_F5), self, activated=self.toggle_live_analysis)
+        QShortcut(QKeySequence(Qt.Key.Key_F6), self, activated=self.toggle_fault_levels)
+        QShortcut(QKeySequence.StandardKey.Delete, self, activated=self.delete_selected_lines)
+        QShortcut(QKeySequence("Ctrl+L"), self, activated=self.connect_selected)
+
+    def toggle_live_analysis(self):
+        """ Re-solve the network on every edit and show flows on the diagram """
+        scene = self.scene()
+        scene.set_live_analysis(scene.analysis is None)
+        state = "on" if scene.analysis else "off"
+        self.setWindowTitle(f"SCOPF Tool - live analysis {state}")
+
+    def toggle_fault_levels(self):
+        """ Show or hide the fault level of every bus for the current network """
+        scene = self.scene()
+        enabled = not scene.faults_shown
+        scene.show_fault_levels(enabled, self.start_worker() if enabled else None)
+        state = "on" if scene.faults_shown else "off"
+        self.setWindowTitle(f"SCOPF Tool - fault levels {state}")
+
+    def start_worker(self):
+        """ Start the analysis worker once; later studies reuse it, a dead one is replaced """
+        if self.worker is not None and not self.worker.is_alive():
+            self.worker.shutdown()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.worker is None:
+            self.worker = OptimizationWorker(self)
+            self.worker.finished.connect(self.fault_levels_done)
+            self.worker.failed.connect(lambda error: print(f"Fault analysis failed: {error}"))
+        return self.worker
+
+    def fault_levels_done(self, result):
+        """ Colour the buses if the study is still current, then free its shared memory """
+        try:
+            self.scene().apply_fault_levels(result.job_id, result["nodes"], result["current"], result["level"])
+        finally:
+            result.release()
+
+    def delete_selected_lines(self):
+        self.scene().remove_lines([item for item in self.scene().selectedItems() if isinstance(item, Line)])
+
+    def connect_selected(self):
+        """ Add a line between exactly two selected buses, sources or loads """
+        nodes = [item for item in self.scene().selectedItems() if hasattr(item, "lines")]
+        if len(nodes) == 2:
+            self.scene().add_line(*nodes)
+
+    def save(self):
+        """ Write a compact snapshot; later edits are autosaved to its journal """
+        if not self.path:
+            self.path, _ = QFileDialog.getSaveFileName(self, "Save Network", "network.sld", "SLD Network (*.sld)")
+        if self.path:
+            save_scene(self.scene(), self.path)
+            self.setWindowTitle(f"SCOPF Tool - {self.path}")
+
+    def open(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Network", "", "SLD Network (*.sld)")
+        if path:
+            try:
+                self.setScene(SLDCanvas(path))
+            except (OSError, ValueError) as e:
+                print(f"Error opening network: {e}")
+                return
+            self.path = path
+            self.setWindowTitle(f"SCOPF Tool - {self.path}")
+
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.shutdown()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = SLDApp()
+    window = SLDApp(sys.argv[1] if len(sys.argv) > 1 else None)
     window.show()
     sys.exit(app.exec())
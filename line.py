@@ -1,23 +1,38 @@
+import numpy as np
 from PyQt6.QtWidgets import QGraphicsLineItem, QInputDialog, QGraphicsPolygonItem, QGraphicsTextItem
 from PyQt6.QtGui import QPen, QBrush, QPolygonF, QTransform 
 from PyQt6.QtCore import Qt, QPointF, QLineF
+from network_model import branch_field
+
+MIN_WIDTH = 1.0  # Pen width of an idle line
+MAX_WIDTH = 8.0  # Pen width of the most heavily loaded line
+
+
+def flow_widths(flows):
+    """ Pen widths for an array of flows, scaled to its peak |flow| and rounded to skip tiny repaints """
+    flows = np.abs(flows)
+    peak = flows.max() if flows.size else 0.0
+    return np.round(MIN_WIDTH + (MAX_WIDTH - MIN_WIDTH) * flows / (peak or 1.0), 1)
 
 class Line(QGraphicsLineItem):
-    def __init__(self, name, item1, item2, impedance=0.1, is_directed=False):
+    """ View of branch `index` in a NetworkModel between the views of its end nodes """
+    impedance = branch_field("impedance")
+    is_directed = branch_field("is_directed")
+
+    def __init__(self, model, index, item1, item2):
         super().__init__()
         self.setPen(QPen(Qt.GlobalColor.black, 2))
         self.setFlags(QGraphicsLineItem.GraphicsItemFlag.ItemIsSelectable)
         self.setZValue(-1)
-        self.name = name
+        self.model = model
+        self.index = index
+        self.name = model.branch_names[index]
         self.item1 = item1
         self.item2 = item2
-        self.impedance = impedance
-        self.is_directed = is_directed
         self.arrow_item = None  # To hold the arrow item
+        self.flow = None  # Latest computed flow (MW), set by the overlay
 
-        # Link the line to both buses        
-        item1.lines.append(self)
-        item2.lines.append(self)
+        # Connectivity lives in the model's adjacency, only geometry is set here
         self.updatePosition()
 
     def updatePosition(self):
@@ -32,12 +47,6 @@ class Line(QGraphicsLineItem):
 
     def updateArrowhead(self):
         """ Update the direction of the arrow at the end of the line """
-        # Remove the previous arrow if it exists
-        if self.arrow_item:
-            self.scene().removeItem(self.arrow_item)
-            self.arrow_item = None
-
-        # Draw new arrow
         line = self.line()
         line_f = QLineF(line.p1(), line.p2())  # Create a QLineF for better angle calculation
         angle = line_f.angle()  # Get the angle of the line
@@ -50,30 +59,53 @@ class Line(QGraphicsLineItem):
         arrow.append(QPointF(arrow_size, -arrow_size / 2))
         arrow.append(QPointF(arrow_size, arrow_size / 2))
 
-        # Rotate the arrow to match the line’s angle
+        # Rotate the arrow to match the line’s angle, pointing back at p1 for reverse flow
+        reverse = self.flow is not None and self.flow < 0
         transform = QTransform()
-        transform.rotate(180 - angle)
+        transform.rotate(-angle if reverse else 180 - angle)
         arrow = transform.map(arrow)
 
-        # Calculate the position for the arrow (closer to p2)
+        # Calculate the position for the arrow (closer to the receiving end)
         # Use a ratio t (0 <= t <= 1) to control how far from p1 the arrow will be
-        t = 0.9  # 90% of the way from p1 to p2 (closer to p2 but not at p2)
+        t = 0.1 if reverse else 0.9  # 90% of the way towards the receiving end
         arrow_pos = line_f.pointAt(t)  # Get the point on the line at ratio t
 
         # Position the arrow at the end of the line
         arrow.translate(arrow_pos)
 
-        # Create an arrow item and add it to the scene
-        self.arrow_item = QGraphicsPolygonItem(arrow, self)
-        self.arrow_item.setBrush(QBrush(Qt.GlobalColor.red))  # Set arrow color
-        self.arrow_item.setZValue(1)  # Ensure the arrow is above the line
+        # Reuse the arrow item instead of recreating it on every move
+        if self.arrow_item is None:
+            self.arrow_item = QGraphicsPolygonItem(arrow, self)
+            self.arrow_item.setBrush(QBrush(Qt.GlobalColor.red))  # Set arrow color
+            self.arrow_item.setZValue(1)  # Ensure the arrow is above the line
+        else:
+            self.arrow_item.setPolygon(arrow)
+
+    def set_flow(self, flow, width):
+        """ Show a computed flow: pen width scales with |flow|, arrow follows its sign """
+        reversed_before = self.flow is not None and self.flow < 0
+        self.flow = flow
+        if self.pen().widthF() != width:
+            self.setPen(QPen(Qt.GlobalColor.black, width))
+        self.setToolTip(f"{self.name}: {flow:.1f} MW")
+        if self.is_directed and reversed_before != (flow < 0):
+            self.updateArrowhead()
+
+    def clear_flow(self):
+        """ Drop the computed flow and go back to the plain pen """
+        reversed_before = self.flow is not None and self.flow < 0
+        self.flow = None
+        self.setPen(QPen(Qt.GlobalColor.black, 2))
+        self.setToolTip("")
+        if self.is_directed and reversed_before:
+            self.updateArrowhead()
 
     def mouseDoubleClickEvent(self, event):
         value, ok = QInputDialog.getDouble(None, "Edit Impedance", 
                                            "Enter Impedance (p.u.):", 
                                            self.impedance, 0, 10, 2)
         if ok:
-            self.impedance = value
+            self.scene().edit(self, "impedance", value)
 
     def mouseMoveEvent(self, event):
         """ Update the position of the line and arrow dynamically when the buses are moved """
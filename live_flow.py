@@ -0,0 +1,200 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from PyQt6.QtCore import QObject, QTimer
+from network_model import BUS, SOURCE, LOAD
+from power_flow import default_slack
+from line import flow_widths
+
+
+class IncrementalDCSolver:
+    """
+    DC power flow over a NetworkModel that absorbs edits as low-rank updates.
+
+    The reduced susceptance matrix is factorised with a sparse LU on the first
+    solve, so a singular network surfaces as a solve error. Edited
+    branches are tracked as dirty and folded into each solve with the
+    Woodbury identity, so an impedance, voltage or topology edit costs one
+    triangular solve per dirty branch instead of a new factorisation. Once
+    more than REFACTOR_RANK branches are dirty the next solve rebuilds the
+    factorisation.
+
+    Branch susceptance is V_i * V_j / x, so a bus voltage edit touches every
+    branch incident to that bus.
+    """
+
+    REFACTOR_RANK = 32
+
+    def __init__(self, model, slack=None):
+        self.model = model
+        self.slack = default_slack(model) if slack is None else model.node_index[slack]
+        self.rebuild()
+
+    def rebuild(self):
+        """ Re-read the model, the next solve factorises from scratch """
+        n = self.model.n_nodes
+        # Reduced (slack-free) position of every node, -1 for the slack
+        self.reduced = np.arange(n) - (np.arange(n) > self.slack)
+        self.reduced[self.slack] = -1
+        self.b = self.susceptance(np.arange(self.model.n_branches))
+        self.base_b = self.b.copy()
+        self.lu = None
+        self.dirty = set()
+        self.columns = {}
+
+    def factorise(self):
+        n = self.model.n_nodes - 1
+        branches = np.arange(len(self.b))
+        f = self.reduced[self.model.from_node[branches]]
+        t = self.reduced[self.model.to_node[branches]]
+        rows, cols, vals = [], [], []
+        for a, c, s in ((f, f, 1.0), (t, t, 1.0), (f, t, -1.0), (t, f, -1.0)):
+            keep = (a >= 0) & (c >= 0)
+            rows.append(a[keep])
+            cols.append(c[keep])
+            vals.append(s * self.b[keep])
+        b_red = sp.csc_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n))
+        self.lu = splu(b_red)
+        self.base_b = self.b.copy()
+        self.dirty = set()
+        self.columns = {}  # Cached B^-1 u_k per dirty branch
+
+    def susceptance(self, branches):
+        """ V_i * V_j / x of the given branch ids, zero when out of service """
+        model = self.model
+        voltage = model.voltage
+        b = voltage[model.from_node[branches]] * voltage[model.to_node[branches]]
+        b = b / np.maximum(model.impedance[branches], 1e-6)
+        return np.where(model.in_service[branches], b, 0.0)
+
+    def mark_line(self, branch):
+        """ Record a changed impedance, or a branch added or taken out of service """
+        if branch >= len(self.b):
+            grow = self.model.n_branches - len(self.b)
+            self.b = np.append(self.b, np.zeros(grow))
+            self.base_b = np.append(self.base_b, np.zeros(grow))
+        self.b[branch] = self.susceptance(branch)
+        if self.b[branch] == self.base_b[branch]:
+            self.dirty.discard(branch)
+        else:
+            self.dirty.add(branch)
+
+    def mark_bus(self, node):
+        """ Record a changed voltage by updating every incident branch """
+        for branch in self.model.incident(node).tolist():
+            self.mark_line(branch)
+
+    def incidence_column(self, branch):
+        u = np.zeros(self.model.n_nodes - 1)
+        f, t = self.reduced[self.model.from_node[branch]], self.reduced[self.model.to_node[branch]]
+        if f >= 0:
+            u[f] += 1.0
+        if t >= 0:
+            u[t] -= 1.0
+        return u
+
+    def injections(self):
+        """ Nodal injections (MW) from the model's load and source columns """
+        model = self.model
+        injection = np.zeros(model.n_nodes)
+        loads = model.kind == LOAD
+        injection[loads] = -model.load_value[loads]
+        # Sources without a dispatched output share the remaining demand equally
+        sources = model.kind == SOURCE
+        dispatched = sources & ~np.isnan(model.power)
+        injection[dispatched] = model.power[dispatched]
+        free = sources & ~dispatched
+        if free.any():
+            injection[free] = -injection.sum() / free.sum()
+        return injection
+
+    def solve(self, injection=None):
+        """
+        Solve the current network.
+
+        Returns:
+        - tuple(np.ndarray, np.ndarray): Node angles (rad) and flows (MW) by branch id.
+
+        Raises:
+        - RuntimeError, np.linalg.LinAlgError: If the edited network is singular
+          (e.g. islanded). The edits stay recorded, so a later solve succeeds
+          once the network is valid again.
+        """
+        if self.lu is None or len(self.dirty) > self.REFACTOR_RANK:
+            self.factorise()
+        if injection is None:
+            injection = self.injections()
+        keep = self.reduced >= 0
+        theta_red = self.lu.solve(injection[keep])
+
+        dirty = sorted(self.dirty)
+        if dirty:
+            for k in dirty:
+                if k not in self.columns:
+                    self.columns[k] = self.lu.solve(self.incidence_column(k))
+            U = np.column_stack([self.incidence_column(k) for k in dirty])
+            Z = np.column_stack([self.columns[k] for k in dirty])
+            D = np.diag(self.b[dirty] - self.base_b[dirty])
+            # Woodbury: (B + U D U^T)^-1 p = y - Z (I + D U^T Z)^-1 D U^T y
+            small = np.eye(len(dirty)) + D @ (U.T @ Z)
+            theta_red = theta_red - Z @ np.linalg.solve(small, D @ (U.T @ theta_red))
+
+        theta = np.zeros(self.model.n_nodes)
+        theta[keep] = theta_red
+        branches = np.arange(len(self.b))
+        flows = self.b * (theta[self.model.from_node[branches]] - theta[self.model.to_node[branches]])
+        return theta, flows
+
+
+class LiveAnalysis(QObject):
+    """
+    Keeps the diagram in step with the network solution while editing.
+
+    Edits only mark the solver dirty and schedule a zero-delay timer, so
+    several edits in one event-loop pass (e.g. an undo of a compound command)
+    cost a single solve and a single repaint.
+    """
+
+    def __init__(self, canvas):
+        super().__init__()
+        self.canvas = canvas
+        self.solver = IncrementalDCSolver(canvas.model)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.refresh)
+        self.solved = False  # Set once a solve succeeded, the bus tooltips show its angles
+        self.refresh()
+
+    def item_changed(self, item, field):
+        if field == "impedance" or field == "in_service":
+            self.solver.mark_line(item.index)
+        elif field == "voltage" and hasattr(item, "lines"):
+            self.solver.mark_bus(item.index)
+        elif field not in ("load_value", "power"):
+            return  # Positions and angles do not change the solution
+        self.timer.start()
+
+    def refresh(self):
+        try:
+            theta, flows = self.solver.solve()
+        except (RuntimeError, np.linalg.LinAlgError) as e:
+            print(f"Live analysis failed, network may be islanded: {e}")
+            return
+
+        widths = flow_widths(flows)
+        for index, line in self.canvas.lines.items():
+            line.set_flow(flows[index].item(), widths[index].item())
+
+        model = self.canvas.model
+        buses = model.indices(BUS)
+        model.angle[buses] = np.degrees(theta[buses])
+        self.solved = True
+        self.canvas.update_bus_tooltips()
+
+    def clear(self):
+        """ Stop solving and take the flows off the diagram """
+        self.timer.stop()
+        self.solved = False
+        for line in [*self.canvas.lines.values(), *self.canvas.removed_lines.values()]:
+            line.clear_flow()
@@ -1,20 +1,24 @@
 from PyQt6.QtWidgets import QGraphicsItem, QGraphicsTextItem, QInputDialog, QGraphicsRectItem
 from PyQt6.QtGui import QPen, QBrush
 from PyQt6.QtCore import Qt
+from network_model import node_field, node_lines
 
 class Load(QGraphicsRectItem):
-    def __init__(self, x, y, load_value=0.0, name="Load"):
+    """ View of load `index` in a NetworkModel; attributes read and write the model arrays """
+    load_value = node_field("load_value")
+    lines = node_lines()  # Connected lines
+
+    def __init__(self, model, index):
         super().__init__(-20, -10, 20, 20)  # Rectangle shape
-        self.setPos(x, y)  # Position of the load
+        self.model = model
+        self.index = index
+        self.name = model.node_names[index]
+        self.setPos(model.x[index], model.y[index])  # Position of the load
         self.setBrush(QBrush(Qt.GlobalColor.green))  # Set the color of the load
         self.setPen(QPen(Qt.GlobalColor.black))  # Outline of the load
         self.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsMovable | 
                       QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
 
-        self.name = name
-        self.load_value = load_value
-        self.lines = []  # Store connected lines
-
         # Create a text item for the load's name and value
         self.text_item = QGraphicsTextItem(f"{self.name}: {self.load_value} MW", self)
         self.text_item.setPos(-15, -25)  # Position of the text above the load
@@ -25,9 +29,18 @@ class Load(QGraphicsRectItem):
                                            f"Enter Load Value (MW) for {self.name}:",
                                            self.load_value, 0, 1000, 2)
         if ok:
-            self.load_value = value
-            # Update the text display to reflect the new load value
-            self.text_item.setPlainText(f"{self.name}: {self.load_value} MW")
+            self.scene().edit(self, "load_value", value)
+
+    def refresh_text(self):
+        """ Update the text display to reflect the current load value """
+        self.text_item.setPlainText(f"{self.name}: {self.load_value} MW")
+
+    def set_load_value(self, value):
+        """ Set a forecast load value, touching the text item only if the label changes """
+        self.load_value = value
+        text = f"{self.name}: {value:.1f} MW"
+        if self.text_item.toPlainText() != text:
+            self.text_item.setPlainText(text)
     
     def mouseMoveEvent(self, event):
         """ Update any connected items (like lines or buses) when the load is moved """
@@ -9,8 +9,10 @@ from PyQt6.QtCore import Qt, QDate
 from datetime import datetime
 
 from weather import get_weather_data
-from models import predict_load, predict_generation
-from process_data import process_data_load, process_data_generation, is_solar
+from overlay import ForecastOverlay
+from worker import OptimizationWorker
+
+HORIZON_HOURS = 168  # 7-day forecast horizon covered by weather.csv
 
 class PowerSystemGUI(QMainWindow):
     def __init__(self):
@@ -74,6 +76,12 @@ class PowerSystemGUI(QMainWindow):
         self.load_prediction = None
         self.gen_prediction_solar = None
         self.gen_prediction_wind = None
+        self.line_risk = None
+
+        # Analysis worker, started on the first optimization run and kept warm
+        self.worker = None
+        self.worker_result = None
+        self.horizon_start = None
 
     def process_background_image(self, image_path):
         """Loads, blurs, and stores the background image."""
@@ -206,45 +214,78 @@ class PowerSystemGUI(QMainWindow):
         else:
             self.status_bar.showMessage("User Manual not found!")
 
-    def run_forecast(self):
-        """Runs the forecast script."""
+    def start_worker(self):
+        """Starts the analysis worker process once; later runs reuse it, a dead one is replaced."""
+        if self.worker is not None and not self.worker.is_alive():
+            self.release_worker_result()
+            self.worker.shutdown()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.worker is None:
+            self.worker = OptimizationWorker(self)
+            self.worker.progress.connect(self.status_bar.showMessage)
+            self.worker.finished.connect(self.show_forecast_overlay)
+            self.worker.failed.connect(lambda error: self.status_bar.showMessage(f"Optimization failed: {error}"))
+        return self.worker
+
+    def submit_horizon_forecast(self):
+        """Sends the horizon forecast and probabilistic power flow to the worker."""
         self.get_selected_date()
-        # data = process_data(self.date, self.hour)
-        date = datetime.strptime(f"{self.date} {self.hour}", "%Y-%m-%d %H")
-        load_data = process_data_load(date)
-        generation_data = process_data_generation(date)
-
-
-        if self.selected_model == "Random Forest":
-            self.load_prediction = predict_load("load_random_forsest", load_data)
-            self.gen_prediction_wind = predict_generation("gen_random_forsest", generation_data)
-            self.gen_prediction_solar = predict_generation("gen_random_forsest", is_solar(generation_data))
-        elif self.selected_model == "xGBoost":
-            self.load_prediction = predict_load("load_xgboost", load_data)
-            self.gen_prediction_wind = predict_generation("gen_xgboost", generation_data)
-            self.gen_prediction_solar = predict_generation("gen_xgboost", is_solar(generation_data))
-        elif self.selected_model == "Neural Net":
-            self.load_prediction = predict_load("load_neural_network", load_data)
-            self.gen_prediction_wind = predict_generation("gen_neural_network", generation_data)
-            self.gen_prediction_solar = predict_generation("gen_neural_network", is_solar(generation_data))
-
-        self.status_bar.showMessage(f"Forecasting Completed {self.gen_prediction_solar} {self.gen_prediction_wind} {self.load_prediction}")
-
+        model_keys = {"Random Forest": "random_forsest", "xGBoost": "xgboost", "Neural Net": "neural_network"}
+        key = model_keys.get(self.selected_model)
+        if key is None:
+            self.status_bar.showMessage("Select a forecast model to overlay the horizon")
+            return
+        self.horizon_start = datetime.strptime(f"{self.date} {self.hour}", "%Y-%m-%d %H")
+        if self.start_worker().submit("horizon", start=self.horizon_start, hours=HORIZON_HOURS, model_key=key):
+            self.status_bar.showMessage("Running SLD Optimization...")
+
+    def show_forecast_overlay(self, result):
+        """Opens the SLD with the forecast horizon overlaid on loads, sources and lines."""
+        self.release_worker_result()
+        self.worker_result = result
+
+        # Forecast for the selected hour, copied out of the shared memory block
+        load = result["load"]
+        self.load_prediction = load[:1].copy()
+        self.gen_prediction_solar = result["solar"][:1].copy()
+        self.gen_prediction_wind = result["wind"][:1].copy()
+
+        self.overlay_window = ForecastOverlay(load, result["solar"], result["wind"],
+                                              self.horizon_start.strftime("%Y-%m-%d %H:00"),
+                                              line_flows=result["line_flows"], branches=result["branches"])
+        self.overlay_window.show()
+
+        # Probability of each line exceeding its rating, per hour, from forecast uncertainty
+        self.line_risk = result["line_risk"]
+        hour, line = divmod(int(self.line_risk.argmax()), self.line_risk.shape[1])
+        worst = self.overlay_window.line_views[line]
+        self.status_bar.showMessage(f"Overlaying {len(load)} forecast hours on the SLD - "
+                                    f"highest overload risk {self.line_risk[hour, line]:.1%} "
+                                    f"on {worst.item1.name}-{worst.item2.name} at +{hour}h")
 
     def run_optimization(self):
-        """Runs the optimization script."""
-        self.run_forecast()
-        # script_path = os.path.abspath("generate_sld.py")
-        # if os.path.exists(script_path):
-        #     subprocess.Popen([sys.executable, script_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        #     self.status_bar.showMessage("Running SLD Optimization...")
-        # else:
-        #     self.status_bar.showMessage("SLD script not found!")
+        """Runs the forecast and optimization in the worker; results arrive in show_forecast_overlay."""
+        self.submit_horizon_forecast()
 
     def update_status(self):
         self.status_bar.showMessage("Running Updated Version")
 
+    def release_worker_result(self):
+        """Drops views into the previous result so the worker can free its shared memory."""
+        self.line_risk = None
+        if self.worker_result is not None:
+            self.worker_result.release()
+            self.worker_result = None
+
+    def closeEvent(self, event):
+        self.release_worker_result()
+        if self.worker is not None:
+            self.worker.shutdown()
+        super().closeEvent(event)
+
     def quit_app(self):
+        self.close()
         QApplication.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+import numpy as np
+
+# Node kinds. Buses, sources and loads share one node index space because
+# lines may connect any two of them.
+BUS, SOURCE, LOAD = 0, 1, 2
+
+NODE_FIELDS = {
+    "kind": np.int8,
+    "x": np.float64,
+    "y": np.float64,
+    "voltage": np.float64,
+    "angle": np.float64,
+    "width": np.float64,       # Buses only
+    "height": np.float64,      # Buses only
+    "load_value": np.float64,  # Loads only (MW)
+    "power": np.float64,       # Sources only (MW), NaN while undispatched
+}
+
+BRANCH_FIELDS = {
+    "from_node": np.int64,
+    "to_node": np.int64,
+    "impedance": np.float64,
+    "is_directed": np.bool_,
+    "in_service": np.bool_,
+}
+
+
+class NetworkModel:
+    """
+    Struct-of-arrays network state.
+
+    Every attribute lives in one NumPy array per field, indexed by integer
+    node or branch id, so analysis code can work on whole columns without
+    touching any QGraphicsItem. Fields are read as trimmed views, e.g.
+    ``model.voltage`` or ``model.impedance``; writes through a view update
+    the model. Ids are stable: removed branches are only taken out of
+    service. Incidence is kept as a CSR adjacency built on demand.
+    """
+
+    def __init__(self, capacity=16):
+        self.n_nodes = 0
+        self.n_branches = 0
+        self.nodes = {field: np.zeros(capacity, dtype) for field, dtype in NODE_FIELDS.items()}
+        self.branches = {field: np.zeros(capacity, dtype) for field, dtype in BRANCH_FIELDS.items()}
+        self.node_names = []
+        self.branch_names = []
+        self.node_index = {}  # Node name -> id
+        self._adjacency = None
+
+    def __getattr__(self, field):
+        # Only reached for names that are not regular attributes
+        if field in NODE_FIELDS:
+            return self.nodes[field][:self.n_nodes]
+        if field in BRANCH_FIELDS:
+            return self.branches[field][:self.n_branches]
+        raise AttributeError(field)
+
+    @staticmethod
+    def _reserve(table, size):
+        capacity = len(next(iter(table.values())))
+        if size > capacity:
+            capacity = max(size, 2 * capacity)
+            for field, array in table.items():
+                grown = np.zeros(capacity, array.dtype)
+                grown[:len(array)] = array
+                table[field] = grown
+
+    def add_nodes(self, kind, names, **fields):
+        """
+        Append nodes in bulk.
+
+        Parameters:
+        - kind (int or array): BUS, SOURCE or LOAD, or one kind per node.
+        - names (list): Unique node names.
+        - fields: Arrays (or scalars) for any NODE_FIELDS.
+
+        Returns:
+        - np.ndarray: Ids of the new nodes.
+        """
+        start, count = self.n_nodes, len(names)
+        self._reserve(self.nodes, start + count)
+        ids = np.arange(start, start + count)
+        self.nodes["kind"][ids] = kind
+        self.nodes["voltage"][ids] = 1.0
+        self.nodes["power"][ids] = np.nan
+        for field, values in fields.items():
+            self.nodes[field][ids] = values
+        for i, name in zip(ids.tolist(), names):
+            self.node_index[name] = i
+        self.node_names.extend(names)
+        self.n_nodes += count
+        self._adjacency = None
+        return ids
+
+    def add_branches(self, names, from_node, to_node, impedance=0.1, is_directed=False):
+        """ Append branches in bulk, returns their ids """
+        start, count = self.n_branches, len(names)
+        self._reserve(self.branches, start + count)
+        ids = np.arange(start, start + count)
+        self.branches["from_node"][ids] = from_node
+        self.branches["to_node"][ids] = to_node
+        self.branches["impedance"][ids] = impedance
+        self.branches["is_directed"][ids] = is_directed
+        self.branches["in_service"][ids] = True
+        self.branch_names.extend(names)
+        self.n_branches += count
+        self._adjacency = None
+        return ids
+
+    def set_in_service(self, branch, in_service):
+        """ Take a branch out of service or restore it; its id stays reserved """
+        self.branches["in_service"][branch] = in_service
+        self._adjacency = None
+
+    def indices(self, kind):
+        """ Ids of all nodes of one kind, in insertion order """
+        return np.flatnonzero(self.kind == kind)
+
+    def in_service_branches(self):
+        return np.flatnonzero(self.in_service)
+
+    def adjacency(self):
+        """
+        CSR incidence of in-service branches.
+
+        Returns:
+        - tuple(np.ndarray, np.ndarray, np.ndarray): indptr, branch ids and
+          neighbour node ids; node i's entries are [indptr[i]:indptr[i + 1]].
+        """
+        if self._adjacency is None:
+            live = self.in_service_branches()
+            ends = np.concatenate([self.from_node[live], self.to_node[live]])
+            other = np.concatenate([self.to_node[live], self.from_node[live]])
+            branch = np.concatenate([live, live])
+            order = np.argsort(ends, kind="stable")
+            indptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(ends, minlength=self.n_nodes), out=indptr[1:])
+            self._adjacency = (indptr, branch[order], other[order])
+        return self._adjacency
+
+    def incident(self, node):
+        """ Ids of in-service branches attached to a node """
+        indptr, branch, _ = self.adjacency()
+        return branch[indptr[node]:indptr[node + 1]]
+
+    @classmethod
+    def from_sld_data(cls, bus_data, source_data, load_data, line_data):
+        """ Build a model from the dict lists used in sld_data.py """
+        model = cls(capacity=len(bus_data) + len(source_data) + len(load_data))
+        model.add_nodes(BUS, [d["name"] for d in bus_data],
+                        **{f: [d[f] for d in bus_data] for f in ("x", "y", "voltage", "angle", "width", "height")})
+        model.add_nodes(SOURCE, [d["name"] for d in source_data],
+                        **{f: [d[f] for d in source_data] for f in ("x", "y", "voltage")})
+        model.add_nodes(LOAD, [d["name"] for d in load_data],
+                        x=[d["x"] for d in load_data], y=[d["y"] for d in load_data],
+                        load_value=[d["power"] for d in load_data])
+
+        lines = [d for d in line_data if d["item1"] in model.node_index and d["item2"] in model.node_index]
+        model.add_branches([d["name"] for d in lines],
+                           [model.node_index[d["item1"]] for d in lines],
+                           [model.node_index[d["item2"]] for d in lines],
+                           [d["impedance"] for d in lines],
+                           [d["is_directed"] for d in lines])
+        return model
+
+
+def node_field(field):
+    """ Property that binds a graphics item attribute to a model node column """
+    def fget(self):
+        return self.model.nodes[field][self.index].item()
+
+    def fset(self, value):
+        self.model.nodes[field][self.index] = value
+    return property(fget, fset)
+
+
+def branch_field(field):
+    """ Property that binds a graphics item attribute to a model branch column """
+    def fget(self):
+        return self.model.branches[field][self.index].item()
+
+    def fset(self, value):
+        self.model.branches[field][self.index] = value
+    return property(fget, fset)
+
+
+def node_lines():
+    """ Property listing the Line views attached to a node, read from the CSR adjacency """
+    def fget(self):
+        scene = self.scene()
+        if scene is None:
+            return []
+        return [scene.lines[k] for k in self.model.incident(self.index).tolist()]
+    return property(fget)
@@ -0,0 +1,167 @@
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QSlider, QPushButton, QLabel
+from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, QTimer
+
+from generate_sld import SLDApp
+from power_flow import DCNetwork, dispatch
+from line import flow_widths
+
+
+def hour_label(hour, start_label=None):
+    """ Caption for one frame of the horizon """
+    return f"{start_label} +{hour}h" if start_label else f"Hour {hour:3d}"
+
+
+class ForecastFrames:
+    """
+    Per-hour forecast frames for one SLDCanvas, usable with or without a view.
+
+    Load, generation and line flows are computed up front for the whole
+    horizon. apply() pushes one hour into the scene items, touching only
+    items whose value differs from the hour currently shown, so stepping
+    through the horizon costs in proportion to what changed.
+    """
+
+    def __init__(self, canvas, load_total, solar=None, wind=None, line_flows=None, branches=None):
+        self.canvas = canvas
+        self.set_forecast(load_total, solar, wind, line_flows, branches)
+
+    def set_forecast(self, load_total, solar=None, wind=None, line_flows=None, branches=None):
+        """
+        Dispatch the forecasts and solve the flows for every hour at once.
+
+        Flows already solved elsewhere (e.g. by the worker process) can be
+        passed as line_flows with one column per id in branches (default:
+        the model's in-service branches); the network is then not solved here.
+        """
+        model = self.canvas.model
+        load_values, source_values = dispatch(model, load_total, solar, wind)
+        self.hours = len(np.atleast_1d(load_total))
+
+        self.load_views = [self.canvas.loads[n] for n in load_values]
+        self.source_views = [self.canvas.sources[n] for n in source_values]
+        self.load_mw = np.column_stack(list(load_values.values()))
+        self.source_mw = np.column_stack(list(source_values.values()))
+
+        if line_flows is None:
+            network = DCNetwork(model)
+            line_flows = network.flows(network.injections(source_values) - network.injections(load_values))
+            branches = network.branches
+        elif branches is None:
+            branches = model.in_service_branches()
+        # Own copies, the inputs may be shared memory views
+        self.branches = np.array(branches)
+        self.line_flows = np.array(line_flows)
+        self.line_views = [self.canvas.lines[k] for k in self.branches.tolist()]
+
+        # Normalise widths over the whole horizon so frames are comparable
+        self.line_widths = flow_widths(self.line_flows)
+        self.current = None  # Hour currently pushed into the items
+
+    def apply(self, hour):
+        """ Push one hour into the scene items, skipping values that did not change """
+        previous = self.current
+        for views, values, setter in ((self.load_views, self.load_mw, "set_load_value"),
+                                      (self.source_views, self.source_mw, "set_power")):
+            changed = range(len(views)) if previous is None else np.flatnonzero(values[hour] != values[previous])
+            for i in changed:
+                getattr(views[i], setter)(values[hour, i].item())
+
+        if previous is None:
+            changed = range(len(self.line_views))
+        else:
+            changed = np.flatnonzero((self.line_flows[hour] != self.line_flows[previous])
+                                     | (self.line_widths[hour] != self.line_widths[previous]))
+        for i in changed:
+            self.line_views[i].set_flow(self.line_flows[hour, i].item(), self.line_widths[hour, i].item())
+        self.current = hour
+
+
+class ForecastOverlay(QWidget):
+    """
+    Live overlay of the forecast horizon onto the SLD.
+
+    Per-hour load, generation and line flows are computed up front for the
+    whole horizon; moving the slider only records the requested hour and a
+    single-shot timer applies the latest one at most once per frame, so a
+    fast drag or playback repaints the scene once per frame instead of once
+    per changed item.
+    """
+
+    FRAME_MS = 16  # Throttle interval, roughly one 60 Hz frame
+    PLAY_MS = 100  # Playback speed, hours advance every PLAY_MS
+
+    def __init__(self, load_total, solar=None, wind=None, start_label=None, line_flows=None, branches=None):
+        super().__init__()
+        self.setWindowTitle("SCOPF Tool - Forecast Overlay")
+        self.setWindowIcon(QIcon("icon.webp"))
+        self.resize(820, 680)
+
+        self.view = SLDApp()
+        self.canvas = self.view.scene()
+        self.frames = ForecastFrames(self.canvas, load_total, solar, wind, line_flows, branches)
+        self.line_views = self.frames.line_views
+        self.hours = self.frames.hours
+        self.start_label = start_label
+
+        # Throttle timer: coalesces slider moves into one scene update per frame
+        self.pending_hour = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(self.FRAME_MS)
+        self.frame_timer.timeout.connect(self.apply_pending)
+
+        self.play_timer = QTimer(self)
+        self.play_timer.setInterval(self.PLAY_MS)
+        self.play_timer.timeout.connect(self.advance)
+
+        # Controls
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, self.hours - 1)
+        self.slider.valueChanged.connect(self.request_hour)
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.toggle_playback)
+        self.hour_label = QLabel()
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.play_button)
+        controls.addWidget(self.slider)
+        controls.addWidget(self.hour_label)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.view)
+        layout.addLayout(controls)
+
+        self.apply_hour(0)
+
+    def request_hour(self, hour):
+        """ Record the requested hour; the frame timer applies only the latest one """
+        self.pending_hour = hour
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def apply_pending(self):
+        if self.pending_hour is not None:
+            hour, self.pending_hour = self.pending_hour, None
+            self.apply_hour(hour)
+
+    def apply_hour(self, hour):
+        """ Push one hour into the scene items as a single batched repaint """
+        self.view.setUpdatesEnabled(False)
+        try:
+            self.frames.apply(hour)
+        finally:
+            self.view.setUpdatesEnabled(True)
+        self.hour_label.setText(hour_label(hour, self.start_label))
+
+    def advance(self):
+        self.slider.setValue((self.slider.value() + 1) % self.hours)
+
+    def toggle_playback(self):
+        if self.play_timer.isActive():
+            self.play_timer.stop()
+            self.play_button.setText("Play")
+        else:
+            self.play_timer.start()
+            self.play_button.setText("Pause")
@@ -0,0 +1,115 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from network_model import SOURCE, LOAD
+
+
+def default_slack(model):
+    """ The intertie balances the system when present, else the first source """
+    if "Intertie" in model.node_index:
+        return model.node_index["Intertie"]
+    sources = model.indices(SOURCE)
+    return int(sources[0]) if len(sources) else 0
+
+
+class DCNetwork:
+    """
+    DC power-flow model of a NetworkModel.
+
+    Buses, sources and loads are all treated as nodes and every in-service
+    branch has reactance equal to its impedance. The reduced susceptance
+    matrix is factorised once with a sparse LU; flows are obtained by
+    solving node angles for all injection columns at once and taking
+    b * (theta_from - theta_to), so no dense PTDF is ever formed.
+    """
+
+    def __init__(self, model, slack=None):
+        self.model = model
+        self.index = model.node_index
+        self.branches = model.in_service_branches()  # Model branch id of each flow column
+        self.slack = default_slack(model) if slack is None else model.node_index[slack]
+
+        self.from_idx = model.from_node[self.branches]
+        self.to_idx = model.to_node[self.branches]
+        self.susceptance = 1.0 / np.maximum(model.impedance[self.branches], 1e-6)
+        self.keep = np.arange(model.n_nodes) != self.slack
+        self.lu = self.factorise()
+
+    def factorise(self):
+        """ Sparse LU of the slack-reduced (nodes-1 x nodes-1) susceptance matrix """
+        n = self.model.n_nodes
+        # Reduced position of every node, -1 for the slack
+        reduced = np.cumsum(self.keep) - 1
+        reduced[self.slack] = -1
+        f, t, b = reduced[self.from_idx], reduced[self.to_idx], self.susceptance
+        rows, cols, vals = [], [], []
+        for r, c, sign in ((f, f, 1.0), (t, t, 1.0), (f, t, -1.0), (t, f, -1.0)):
+            valid = (r >= 0) & (c >= 0)
+            rows.append(r[valid])
+            cols.append(c[valid])
+            vals.append(sign * b[valid])
+        b_red = sp.csc_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                              shape=(n - 1, n - 1))
+        return splu(b_red)
+
+    def angles(self, injection):
+        """ Node angles (rad) for injections of shape (nodes,) or (hours, nodes) """
+        injection = np.asarray(injection, dtype=float)
+        theta = np.zeros(injection.shape)
+        # One multi-column solve for the whole horizon
+        theta[..., self.keep] = self.lu.solve(np.ascontiguousarray(injection[..., self.keep].T)).T
+        return theta
+
+    def injections(self, values):
+        """
+        Assemble nodal injections from a {name: MW} mapping.
+
+        Values may be scalars or arrays over the horizon; the result has shape
+        (hours, nodes). Loads should be given as negative injections.
+        """
+        hours = max((np.size(v) for v in values.values()), default=1)
+        injection = np.zeros((hours, self.model.n_nodes))
+        for name, value in values.items():
+            injection[:, self.index[name]] += value
+        return injection
+
+    def flows(self, injection):
+        """ Line flows (MW) for injections of shape (nodes,) or (hours, nodes) """
+        theta = self.angles(injection)
+        return self.susceptance * (theta[..., self.from_idx] - theta[..., self.to_idx])
+
+
+def dispatch(model, load_total, solar=None, wind=None):
+    """
+    Spread system-level forecasts over the loads and sources of a NetworkModel.
+
+    The load forecast is shared between loads in proportion to their base
+    values, solar and wind forecasts go to the matching sources and the
+    remaining sources share the residual demand equally.
+
+    Returns:
+    - tuple(dict, dict): Per-load and per-source MW arrays over the horizon.
+    """
+    load_total = np.atleast_1d(np.asarray(load_total, dtype=float))
+    loads = model.indices(LOAD)
+    base = model.load_value[loads]
+    share = base / base.sum() if base.sum() > 0 else np.full(len(base), 1.0 / max(len(base), 1))
+    load_values = {model.node_names[i]: load_total * s for i, s in zip(loads.tolist(), share)}
+
+    sources = [model.node_names[i] for i in model.indices(SOURCE).tolist()]
+    renewable = np.zeros_like(load_total)
+    source_values = {}
+    for name in sources:
+        if "Solar" in name and solar is not None:
+            source_values[name] = np.atleast_1d(np.asarray(solar, dtype=float))
+        elif "Wind" in name and wind is not None:
+            source_values[name] = np.atleast_1d(np.asarray(wind, dtype=float))
+        else:
+            continue
+        renewable = renewable + source_values[name]
+
+    dispatchable = [name for name in sources if name not in source_values]
+    for name in dispatchable:
+        source_values[name] = (load_total - renewable) / len(dispatchable)
+
+    return load_values, source_values
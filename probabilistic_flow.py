@@ -0,0 +1,93 @@
+import numpy as np
+from power_flow import DCNetwork, dispatch
+
+LINE_RATING_MW = 100.0  # Default thermal limit when no per-line ratings are given
+
+# Relative forecast error (standard deviation as a fraction of the forecast)
+ERROR_STD = {"load": 0.05, "solar": 0.20, "wind": 0.25}
+
+# Correlation between load, solar and wind forecast errors, in that order
+ERROR_CORRELATION = np.array([
+    [1.0, -0.1, 0.0],
+    [-0.1, 1.0, -0.2],
+    [0.0, -0.2, 1.0],
+])
+
+CHUNK_BYTES = 64 * 2**20  # Upper bound for one chunk of sampled flows
+
+
+def flow_sensitivities(network, model):
+    """
+    Line flow change per MW of system load, solar and wind output.
+
+    dispatch() is linear in its inputs, so dispatching one unit of each
+    forecast as a three-hour "horizon" and solving it in one multi-column
+    solve gives the (lines x 3) factors that map forecast errors straight
+    to flow deviations.
+    """
+    load_values, source_values = dispatch(model, [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])
+    injection = network.injections(source_values) - network.injections(load_values)
+    return network.flows(injection).T
+
+
+def exceedance_probability(model, load, solar, wind, scenarios=10000, limits=LINE_RATING_MW,
+                           error_std=None, correlation=ERROR_CORRELATION, seed=None, network=None):
+    """
+    Monte Carlo probabilistic DC power flow around point forecasts.
+
+    Correlated relative errors are sampled around the forecasts and every
+    scenario of every hour is solved at once as a product with the flow
+    sensitivities. Samples are drawn in chunks whose peak working memory
+    stays under CHUNK_BYTES, and only exceedance counts are kept between
+    chunks.
+
+    Parameters:
+    - model (NetworkModel): The network, e.g. SLDCanvas.model.
+    - load, solar, wind (array): Point forecasts (MW) over the horizon.
+    - scenarios (int): Samples per hour.
+    - limits (float or array): Line ratings (MW), scalar or one per line.
+    - error_std (dict): Relative error standard deviation for "load", "solar" and "wind".
+    - correlation (array): 3x3 error correlation matrix.
+    - seed (int): Random seed for reproducible studies.
+    - network (DCNetwork): Prebuilt network, built from the model when omitted.
+
+    Returns:
+    - np.ndarray: (hours, lines) probability that |flow| exceeds the line limit,
+      with columns in network.branches order.
+    """
+    network = network or DCNetwork(model)
+    std = {**ERROR_STD, **(error_std or {})}
+    forecast = np.column_stack([np.atleast_1d(np.asarray(v, dtype=float)) for v in (load, solar, wind)])
+    hours, n_lines = len(forecast), len(network.branches)
+
+    load_values, source_values = dispatch(model, *forecast.T)
+    base_flows = network.flows(network.injections(source_values) - network.injections(load_values))
+    sensitivity = flow_sensitivities(network, model)  # (lines, 3)
+
+    limits = np.broadcast_to(np.asarray(limits, dtype=float), (n_lines,))
+    scale = forecast * np.array([std["load"], std["solar"], std["wind"]])  # (hours, 3)
+    chol = np.linalg.cholesky(correlation)
+    rng = np.random.default_rng(seed)
+
+    # Peak memory per scenario-hour is one float64 flow per line plus its boolean
+    # exceedance mask; the flows are shifted and rectified in place. When even one
+    # scenario of the whole horizon is over budget, hours are processed in blocks.
+    cell = 9 * max(n_lines, 1)
+    hour_block = max(1, min(hours, CHUNK_BYTES // cell))
+    chunk = max(1, min(scenarios, CHUNK_BYTES // (hour_block * cell + 2 * 8 * 3 * hours)))
+    exceed = np.zeros((hours, n_lines), dtype=np.int64)
+    buffer = np.empty((chunk, hour_block, n_lines))  # Reused by every block
+    for start in range(0, scenarios, chunk):
+        size = min(chunk, scenarios - start)
+        errors = (rng.standard_normal((size, hours, 3)) @ chol.T) * scale
+        # Generation cannot go negative, so clip the sampled output and keep the delta
+        errors[..., 1:] = np.maximum(forecast[:, 1:] + errors[..., 1:], 0.0) - forecast[:, 1:]
+        for h in range(0, hours, hour_block):
+            block = slice(h, h + hour_block)
+            flows = buffer[:size, :min(hour_block, hours - h)]
+            np.matmul(errors[:, block], sensitivity.T, out=flows)
+            np.add(flows, base_flows[block], out=flows)
+            np.abs(flows, out=flows)
+            exceed[block] += np.greater(flows, limits).sum(axis=0)
+
+    return exceed / scenarios
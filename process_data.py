@@ -25,7 +25,7 @@ def is_solar(data):
     )
     return data
 
-def process_data_generation(date):
+def process_data_generation(date, hours=1):
     data = pd.read_csv("weather.csv")
     data["time"] = pd.to_datetime(data["time"])
     data.rename(columns={
@@ -49,7 +49,8 @@ def process_data_generation(date):
     ]
     
 
-    data = data[data["Date"] == pd.to_datetime(date)]
+    start = pd.to_datetime(date)
+    data = data[(data["Date"] >= start) & (data["Date"] < start + pd.Timedelta(hours=hours))]
 
     columns_to_drop = [column for column in data.columns if column not in columns]
     data.drop(columns=columns_to_drop, axis=1, inplace=True)
@@ -92,7 +93,7 @@ def process_data_generation(date):
     return data
 
 
-def process_data_load(date):
+def process_data_load(date, hours=1):
     data = pd.read_csv("weather.csv")
     data["time"] = pd.to_datetime(data["time"])
     data.rename(columns={
@@ -116,7 +117,8 @@ def process_data_load(date):
     ]
     
 
-    data = data[data["Date"] == pd.to_datetime(date)]
+    start = pd.to_datetime(date)
+    data = data[(data["Date"] >= start) & (data["Date"] < start + pd.Timedelta(hours=hours))]
 
     columns_to_drop = [column for column in data.columns if column not in columns]
     data.drop(columns=columns_to_drop, axis=1, inplace=True)
@@ -0,0 +1,207 @@
+import os
+import sys
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+
+# Must be set before QApplication is created; an explicit platform still wins
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter, QPdfWriter, QPageSize, QFont
+from PyQt6.QtCore import Qt, QRectF, QSize, QSizeF, QRect, QMarginsF
+from PyQt6.QtSvg import QSvgGenerator
+
+from generate_sld import SLDCanvas
+from overlay import ForecastFrames, hour_label
+
+FORMATS = ("png", "svg", "pdf")
+CAPTION_HEIGHT = 24
+
+_app = None
+_frames = None  # Scene and frames owned by one render process, built once by init_renderer
+
+
+def paint_frame(scene, painter, width, height, caption=None):
+    """ Draw the scene scaled into width x height, with an optional caption strip on top """
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.fillRect(QRectF(0, 0, width, height), Qt.GlobalColor.white)
+    top = 0
+    if caption:
+        painter.setFont(QFont("Sans", 11, QFont.Weight.Bold))
+        painter.drawText(QRectF(8, 0, width - 16, CAPTION_HEIGHT), Qt.AlignmentFlag.AlignVCenter, caption)
+        top = CAPTION_HEIGHT
+    scene.render(painter, QRectF(0, top, width, height - top), scene.sceneRect())
+
+
+def render_scene(scene, path, fmt=None, scale=1.0, caption=None):
+    """
+    Render an SLD scene to a PNG, SVG or PDF file.
+
+    Parameters:
+    - scene (QGraphicsScene): The scene to render, typically an SLDCanvas.
+    - path (str): Output file.
+    - fmt (str): "png", "svg" or "pdf"; taken from the extension when omitted.
+    - scale (float): Output pixels per scene unit.
+    - caption (str): Text drawn above the diagram.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    rect = scene.sceneRect()
+    width = int(rect.width() * scale)
+    height = int(rect.height() * scale) + (CAPTION_HEIGHT if caption else 0)
+
+    if fmt == "png":
+        device = QImage(width, height, QImage.Format.Format_ARGB32)
+    elif fmt == "svg":
+        device = QSvgGenerator()
+        device.setFileName(path)
+        device.setSize(QSize(width, height))
+        device.setViewBox(QRect(0, 0, width, height))
+        device.setTitle(caption or "SLD")
+    elif fmt == "pdf":
+        device = QPdfWriter(path)
+        device.setResolution(72)  # One PDF point per output pixel
+        device.setPageSize(QPageSize(QSizeF(width, height), QPageSize.Unit.Point))
+        device.setPageMargins(QMarginsF(0, 0, 0, 0))
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}, expected one of {FORMATS}")
+
+    painter = QPainter(device)
+    paint_frame(scene, painter, width, height, caption)
+    painter.end()
+    if fmt == "png":
+        device.save(path)
+    return path
+
+
+def init_renderer(network_path, load, solar, wind, line_flows):
+    """ Pool initializer: build the scene and the horizon frames once per process """
+    global _app, _frames
+    _app = QApplication.instance() or QApplication([])
+    _frames = ForecastFrames(SLDCanvas(network_path, attach_journal=False), load, solar, wind, line_flows)
+
+
+def render_hours(hours, out_dir, fmt, scale, start_label):
+    """ Render consecutive hours on this process's scene, updating only what changed """
+    paths = []
+    for hour in hours:
+        _frames.apply(hour)
+        path = os.path.join(out_dir, f"sld_{hour:03d}.{fmt}")
+        paths.append(render_scene(_frames.canvas, path, fmt, scale, hour_label(hour, start_label)))
+    return paths
+
+
+def render_horizon(out_dir, load, solar, wind, line_flows=None, network_path=None, fmt="png",
+                   scale=1.0, start_label=None, workers=None):
+    """
+    Render one snapshot per forecast hour across a pool of processes.
+
+    Each process builds its scene once and renders a contiguous run of hours,
+    so consecutive frames only touch the items whose values changed.
+
+    Returns:
+    - list: Frame paths in hour order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    hours = len(np.atleast_1d(load))
+    workers = max(1, min(workers or os.cpu_count() or 1, hours))
+    chunks = [chunk.tolist() for chunk in np.array_split(np.arange(hours), workers)]
+
+    # Spawn keeps Qt out of forked children; each process gets its own QApplication
+    context = mp.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_renderer,
+                             initargs=(network_path, load, solar, wind, line_flows)) as pool:
+        results = pool.map(render_hours, chunks, [out_dir] * workers, [fmt] * workers,
+                           [scale] * workers, [start_label] * workers)
+        return [path for paths in results for path in paths]
+
+
+def render_report(path, load, solar, wind, line_flows=None, network_path=None, start_label=None):
+    """ Write a multi-page PDF report with one diagram per forecast hour on a single scene """
+    global _app
+    _app = QApplication.instance() or QApplication([])
+    frames = ForecastFrames(SLDCanvas(network_path, attach_journal=False), load, solar, wind, line_flows)
+    rect = frames.canvas.sceneRect()
+    width, height = int(rect.width()), int(rect.height()) + CAPTION_HEIGHT
+
+    writer = QPdfWriter(path)
+    writer.setResolution(72)
+    writer.setPageSize(QPageSize(QSizeF(width, height), QPageSize.Unit.Point))
+    writer.setPageMargins(QMarginsF(0, 0, 0, 0))
+    writer.setTitle(f"SLD forecast report {start_label or ''}".strip())
+
+    painter = QPainter(writer)
+    for hour in range(frames.hours):
+        if hour:
+            writer.newPage()
+        frames.apply(hour)
+        paint_frame(frames.canvas, painter, width, height, hour_label(hour, start_label))
+    painter.end()
+    return path
+
+
+def write_timelapse(frame_paths, path, fps=8):
+    """ Assemble PNG frames into an MP4 time-lapse """
+    import cv2
+    first = cv2.imread(frame_paths[0])
+    height, width = first.shape[:2]
+    video = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for frame_path in frame_paths:
+        video.write(cv2.imread(frame_path))
+    video.release()
+    return path
+
+
+def load_forecast(args):
+    """
+    Forecast arrays from an .npz file (load, solar, wind and optional
+    line_flows) or by running the forecast models like the GUI does.
+    """
+    if args.forecast:
+        data = np.load(args.forecast)
+        return data["load"], data["solar"], data["wind"], data["line_flows"] if "line_flows" in data else None
+
+    from worker import WorkerState, horizon_job
+    start = datetime.strptime(args.start, "%Y-%m-%d %H")
+    params = {"start": start, "hours": args.hours, "model_key": args.model, "network_path": args.network}
+    result = horizon_job(WorkerState(), params, print)
+    return result["load"], result["solar"], result["wind"], result["line_flows"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render SLD snapshots over the forecast horizon without a display.")
+    parser.add_argument("out_dir", help="Directory for the per-hour frames")
+    parser.add_argument("--network", help="Binary .sld snapshot (defaults to sld_data.py)")
+    parser.add_argument("--forecast", help=".npz with load, solar, wind and optional line_flows arrays")
+    parser.add_argument("--model", default="xgboost", help="Forecast model key when --forecast is not given")
+    parser.add_argument("--start", default=datetime.now().strftime("%Y-%m-%d 00"), help="Horizon start, 'YYYY-MM-DD HH'")
+    parser.add_argument("--hours", type=int, default=168)
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", help="Also write a multi-page PDF report to this path")
+    parser.add_argument("--timelapse", help="Also write an MP4 time-lapse to this path (PNG frames only)")
+    parser.add_argument("--fps", type=int, default=8)
+    args = parser.parse_args(argv)
+    if args.timelapse and args.format != "png":
+        parser.error("--timelapse needs --format png")
+
+    load, solar, wind, line_flows = load_forecast(args)
+    start_label = args.start if not args.forecast else None
+
+    paths = render_horizon(args.out_dir, load, solar, wind, line_flows, args.network, args.format,
+                           args.scale, start_label, args.workers)
+    print(f"Rendered {len(paths)} frames to {args.out_dir}")
+
+    if args.report:
+        render_report(args.report, load, solar, wind, line_flows, args.network, start_label)
+        print(f"Report written to {args.report}")
+    if args.timelapse:
+        write_timelapse(paths, args.timelapse, args.fps)
+        print(f"Time-lapse written to {args.timelapse}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
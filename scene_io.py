@@ -0,0 +1,333 @@
+import os
+import struct
+import numpy as np
+from line import Line
+from network_model import NetworkModel, BUS, SOURCE, LOAD
+
+# Snapshot layout (little endian, schema VERSION 2):
+#   header | node records | branch records | names
+# Node and branch tables mirror the NetworkModel columns, so a snapshot is
+# read with one frombuffer per table and copied into the model column by
+# column. Names are one NUL separated UTF-8 blob, nodes then branches.
+# Removed branches are kept out of service so ids stay stable.
+MAGIC = b"SLDB"
+VERSION = 2
+PREFIX = struct.Struct("<4sH")  # magic, version
+HEADER = struct.Struct("<4sHQ4d3I")  # prefix, snapshot id, scene rect, node/branch counts, names size
+
+NODE_DTYPE = np.dtype([("kind", "u1"), ("x", "<f8"), ("y", "<f8"), ("voltage", "<f8"), ("angle", "<f8"),
+                       ("width", "<f8"), ("height", "<f8"), ("load_value", "<f8")])
+BRANCH_DTYPE = np.dtype([("from_node", "<u4"), ("to_node", "<u4"), ("impedance", "<f8"),
+                         ("is_directed", "u1"), ("in_service", "u1")])
+
+# Schema version 1: separate bus, source, load and line tables
+HEADER_V1 = struct.Struct("<4sHQ4d5I")
+BUS_DTYPE_V1 = np.dtype([("x", "<f8"), ("y", "<f8"), ("voltage", "<f8"), ("angle", "<f8"),
+                         ("width", "<f8"), ("height", "<f8")])
+SOURCE_DTYPE_V1 = np.dtype([("x", "<f8"), ("y", "<f8"), ("voltage", "<f8")])
+LOAD_DTYPE_V1 = np.dtype([("x", "<f8"), ("y", "<f8"), ("load_value", "<f8")])
+LINE_DTYPE_V1 = np.dtype([("item1", "<u4"), ("item2", "<u4"), ("impedance", "<f8"), ("is_directed", "u1")])
+
+# Journal layout: header followed by fixed-width records, each one absolute
+# assignment (kind, field, id, a, b) to a node or branch. Undo and redo append
+# the restored value as a new record, so replaying the log in order
+# reproduces the scene. Topology edits are records too: "add" appends branch
+# id between nodes a and b, "in_service" takes it out of or back into service.
+JOURNAL_MAGIC = b"SLDJ"
+JOURNAL_HEADER = struct.Struct("<4sHQ")  # magic, version, snapshot id
+JOURNAL_DTYPE = np.dtype([("kind", "u1"), ("field", "u1"), ("index", "<u4"), ("a", "<f8"), ("b", "<f8")])
+
+NODE, BRANCH = 0, 1
+LINES_V1 = 3  # Schema 1 journals used kinds 0-2 for buses, sources and loads, 3 for lines
+FIELDS = ("pos", "voltage", "angle", "impedance", "load_value", "in_service", "add")
+
+
+def journal_path(path):
+    return path + ".journal"
+
+
+def assign(canvas, item, field, value):
+    """ Apply one edited value to an item and refresh whatever depends on it """
+    if field == "in_service":
+        canvas.set_in_service(item.index, bool(value))
+    elif field == "pos":
+        item.setPos(*value)
+        item.model.x[item.index], item.model.y[item.index] = value
+        for line in item.lines:
+            line.updatePosition()
+    else:
+        setattr(item, field, value)
+        if hasattr(item, "refresh_text"):
+            item.refresh_text()
+
+
+def save_scene(canvas, path):
+    """
+    Write the network model and layout of an SLDCanvas as a binary snapshot.
+
+    The snapshot is written to a temporary file and swapped in atomically,
+    then the journal is restarted against the new snapshot.
+    """
+    model = canvas.model
+    nodes = np.zeros(model.n_nodes, dtype=NODE_DTYPE)
+    for field in NODE_DTYPE.names:
+        nodes[field] = getattr(model, field)
+    branches = np.zeros(model.n_branches, dtype=BRANCH_DTYPE)
+    for field in BRANCH_DTYPE.names:
+        branches[field] = getattr(model, field)
+    names = "\0".join(model.node_names + model.branch_names).encode("utf-8")
+
+    snapshot_id = int.from_bytes(os.urandom(8), "little")
+    rect = canvas.sceneRect()
+    header = HEADER.pack(MAGIC, VERSION, snapshot_id, rect.x(), rect.y(), rect.width(), rect.height(),
+                         model.n_nodes, model.n_branches, len(names))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(nodes.tobytes())
+        f.write(branches.tobytes())
+        f.write(names)
+    os.replace(tmp_path, path)
+
+    canvas.journal.attach(path, snapshot_id, reset=True)
+
+
+def read_snapshot(path):
+    """
+    Read a binary snapshot into a NetworkModel without creating any items.
+
+    Returns:
+    - tuple(NetworkModel, tuple, int): The model, scene rect and snapshot id.
+
+    Raises:
+    - ValueError: If the file is not a snapshot, is truncated or uses an unsupported schema.
+    """
+    with open(path, "rb") as f:
+        buf = f.read()
+
+    if len(buf) < PREFIX.size or PREFIX.unpack_from(buf)[0] != MAGIC:
+        raise ValueError(f"{path} is not an SLD snapshot")
+    version = PREFIX.unpack_from(buf)[1]
+    if version == 1:
+        return read_snapshot_v1(buf, path)
+    if version != VERSION:
+        raise ValueError(f"{path} uses schema version {version}, supported up to {VERSION}")
+
+    check_size(buf, path, HEADER.size)
+    _, _, snapshot_id, rx, ry, rw, rh, n_nodes, n_branches, names_size = HEADER.unpack_from(buf)
+    offset = HEADER.size
+    check_size(buf, path, offset + NODE_DTYPE.itemsize * n_nodes + BRANCH_DTYPE.itemsize * n_branches + names_size)
+    nodes = np.frombuffer(buf, dtype=NODE_DTYPE, count=n_nodes, offset=offset)
+    offset += NODE_DTYPE.itemsize * n_nodes
+    branches = np.frombuffer(buf, dtype=BRANCH_DTYPE, count=n_branches, offset=offset)
+    offset += BRANCH_DTYPE.itemsize * n_branches
+    names = buf[offset:offset + names_size].decode("utf-8").split("\0")
+
+    model = NetworkModel(capacity=max(n_nodes, n_branches, 1))
+    model.add_nodes(nodes["kind"], names[:n_nodes],
+                    **{field: nodes[field] for field in NODE_DTYPE.names if field != "kind"})
+    model.add_branches(names[n_nodes:n_nodes + n_branches], branches["from_node"], branches["to_node"],
+                       branches["impedance"], branches["is_directed"])
+    model.branches["in_service"][:n_branches] = branches["in_service"]
+    return model, (rx, ry, rw, rh), snapshot_id
+
+
+def check_size(buf, path, size):
+    """ Raise ValueError unless buf holds at least size bytes """
+    if len(buf) < size:
+        raise ValueError(f"{path} is truncated: {len(buf)} bytes, expected {size}")
+
+
+def read_snapshot_v1(buf, path):
+    """ Convert a schema version 1 snapshot (per-kind tables) into a model """
+    check_size(buf, path, HEADER_V1.size)
+    _, _, snapshot_id, rx, ry, rw, rh, n_bus, n_source, n_load, n_line, names_size = HEADER_V1.unpack_from(buf)
+    offset = HEADER_V1.size
+    layout = ((BUS_DTYPE_V1, n_bus), (SOURCE_DTYPE_V1, n_source), (LOAD_DTYPE_V1, n_load), (LINE_DTYPE_V1, n_line))
+    check_size(buf, path, offset + sum(dtype.itemsize * count for dtype, count in layout) + names_size)
+    tables = []
+    for dtype, count in layout:
+        tables.append(np.frombuffer(buf, dtype=dtype, count=count, offset=offset))
+        offset += dtype.itemsize * count
+    names = buf[offset:offset + names_size].decode("utf-8").split("\0")
+    buses, sources, loads, lines = tables
+
+    model = NetworkModel(capacity=max(n_bus + n_source + n_load, n_line, 1))
+    start = 0
+    for kind, table in ((BUS, buses), (SOURCE, sources), (LOAD, loads)):
+        model.add_nodes(kind, names[start:start + len(table)], **{field: table[field] for field in table.dtype.names})
+        start += len(table)
+    model.add_branches(names[start:start + n_line], lines["item1"], lines["item2"],
+                       lines["impedance"], lines["is_directed"])
+    return model, (rx, ry, rw, rh), snapshot_id
+
+
+def load_scene(canvas, path, attach=True):
+    """
+    Populate an empty SLDCanvas from a binary snapshot and replay its journal.
+
+    With attach=False the files are only read: the journal is neither
+    upgraded nor attached, so later edits are not autosaved. Use this for
+    headless or concurrent readers.
+    """
+    model, rect, snapshot_id = read_snapshot(path)
+    canvas.setSceneRect(*rect)
+    canvas.build_views(model)
+    replay_journal(canvas, path, snapshot_id, upgrade=attach)
+    if attach:
+        canvas.journal.attach(path, snapshot_id)
+
+
+def replay_journal(canvas, path, snapshot_id, upgrade=True):
+    """ Re-apply the edits logged since the snapshot was written """
+    jpath = journal_path(path)
+    if not os.path.exists(jpath):
+        return
+    with open(jpath, "rb") as f:
+        buf = f.read()
+    if len(buf) < JOURNAL_HEADER.size:
+        return
+    magic, version, journal_id = JOURNAL_HEADER.unpack_from(buf)
+    if magic != JOURNAL_MAGIC or journal_id != snapshot_id or version not in (1, VERSION):
+        print(f"Ignoring journal {jpath}: it does not belong to this snapshot")
+        return
+
+    # A torn final record from an interrupted write is dropped
+    count = (len(buf) - JOURNAL_HEADER.size) // JOURNAL_DTYPE.itemsize
+    entries = np.frombuffer(buf, dtype=JOURNAL_DTYPE, count=count, offset=JOURNAL_HEADER.size)
+    if version == 1:
+        entries = convert_journal_v1(entries, canvas.model)
+        if upgrade:
+            write_journal(jpath, snapshot_id, entries)  # Upgrade in place so new records can be appended
+    model = canvas.model
+    for kind, field, index, a, b in entries.tolist():
+        field = FIELDS[field]
+        if field == "add":
+            if index == model.n_branches:  # Branches already in the snapshot are skipped
+                model.add_branches([""], [int(a)], [int(b)], 0.1, True)
+                canvas.add_line_view(index)
+            continue
+        if field == "in_service":
+            canvas.set_in_service(index, bool(a))
+            continue
+        item = canvas.nodes[index] if kind == NODE else canvas.lines.get(index)
+        if item is None:
+            model.branches[field][index] = a  # Edit to a branch now out of service
+        else:
+            assign(canvas, item, field, (a, b) if field == "pos" else a)
+
+
+def convert_journal_v1(entries, model):
+    """ Map schema 1 per-kind item indices onto node and branch ids """
+    # Schema 1 snapshots are read with buses, then sources, then loads
+    counts = np.bincount(model.kind, minlength=3)
+    offsets = np.array([0, counts[BUS], counts[BUS] + counts[SOURCE]])
+    entries = entries.copy()
+    lines = entries["kind"] == LINES_V1
+    entries["index"][~lines] += offsets[entries["kind"][~lines]].astype(entries["index"].dtype)
+    entries["kind"] = np.where(lines, BRANCH, NODE)
+    return entries
+
+
+def write_journal(jpath, snapshot_id, entries):
+    """ Atomically replace a journal with the given records """
+    tmp_path = jpath + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, VERSION, snapshot_id))
+        f.write(entries.tobytes())
+    os.replace(tmp_path, jpath)
+
+
+class CommandJournal:
+    """
+    Undo/redo stack for scene edits with incremental autosave.
+
+    Every applied change (including undo and redo) is appended to the
+    snapshot's journal as a fixed-width delta record, so autosave never
+    rewrites the snapshot itself.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.undo_stack = []
+        self.redo_stack = []
+        self.file = None
+        self.path = None
+
+    def attach(self, path, snapshot_id, reset=False):
+        """ Start appending to the journal of the snapshot at path """
+        if self.file:
+            self.file.close()
+        self.path = path
+
+        jpath = journal_path(path)
+        if not reset and os.path.exists(jpath):
+            with open(jpath, "rb") as f:
+                header = f.read(JOURNAL_HEADER.size)
+            if header != JOURNAL_HEADER.pack(JOURNAL_MAGIC, VERSION, snapshot_id):
+                # Never discard edits that could not be replayed, keep them next to the snapshot
+                backup = jpath + ".orphan"
+                os.replace(jpath, backup)
+                print(f"Kept unreadable journal as {backup}")
+        if reset or not os.path.exists(jpath):
+            with open(jpath, "wb") as f:
+                f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, VERSION, snapshot_id))
+        self.file = open(jpath, "ab")
+        # Drop a torn final record so new appends stay aligned
+        size = self.file.tell() - JOURNAL_HEADER.size
+        self.file.truncate(JOURNAL_HEADER.size + size - size % JOURNAL_DTYPE.itemsize)
+
+    def execute(self, changes):
+        """
+        Apply and record a command.
+
+        Parameters:
+        - changes (list): (item, field, old_value, new_value) tuples applied as one undo step.
+        """
+        self.apply(changes, redo=True)
+        self.undo_stack.append(changes)
+        self.redo_stack.clear()
+
+    def undo(self):
+        if self.undo_stack:
+            changes = self.undo_stack.pop()
+            self.apply(changes, redo=False)
+            self.redo_stack.append(changes)
+
+    def redo(self):
+        if self.redo_stack:
+            changes = self.redo_stack.pop()
+            self.apply(changes, redo=True)
+            self.undo_stack.append(changes)
+
+    def apply(self, changes, redo):
+        for item, field, old, new in changes:
+            assign(self.canvas, item, field, new if redo else old)
+        # Persist before notifying listeners, so a failing listener cannot lose the edit
+        self.write(changes, redo)
+        for item, field, old, new in changes:
+            self.canvas.item_changed(item, field)
+
+    def record_add(self, branch):
+        """ Log a newly appended branch so replay can recreate it """
+        if self.file is None:
+            return
+        model = self.canvas.model
+        records = np.array([(BRANCH, FIELDS.index("add"), branch, model.from_node[branch], model.to_node[branch]),
+                            (BRANCH, FIELDS.index("impedance"), branch, model.impedance[branch], 0.0)],
+                           dtype=JOURNAL_DTYPE)
+        self.file.write(records.tobytes())
+        self.file.flush()
+
+    def write(self, changes, redo):
+        if self.file is None:
+            return  # Unsaved scene: undo/redo stays in memory only
+        records = np.zeros(len(changes), dtype=JOURNAL_DTYPE)
+        for i, (item, field, old, new) in enumerate(changes):
+            value = new if redo else old
+            kind = BRANCH if isinstance(item, Line) else NODE
+            a, b = value if field == "pos" else (value, 0.0)
+            records[i] = (kind, FIELDS.index(field), item.index, a, b)
+        self.file.write(records.tobytes())
+        self.file.flush()
@@ -1,20 +1,25 @@
+import numpy as np
 from PyQt6.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsLineItem, QGraphicsEllipseItem, QGraphicsTextItem, QInputDialog, QGraphicsPolygonItem, QGraphicsRectItem
 from PyQt6.QtGui import QPen, QBrush, QPainter, QPainterPath, QPolygonF, QTransform 
 from PyQt6.QtCore import Qt, QPointF, QLineF
+from network_model import node_field, node_lines
 
 class Source(QGraphicsEllipseItem):
-    def __init__(self, x, y, voltage=1.0, name="Source"):
+    """ View of source `index` in a NetworkModel; attributes read and write the model arrays """
+    voltage = node_field("voltage")
+    lines = node_lines()  # Connected lines
+
+    def __init__(self, model, index):
         super().__init__(-15, -15, 30, 30)  # Circle shape
-        self.setPos(x, y)  # Position of the source
+        self.model = model
+        self.index = index
+        self.name = model.node_names[index]
+        self.setPos(model.x[index], model.y[index])  # Position of the source
         self.setBrush(QBrush(Qt.GlobalColor.red))  # Set the color of the source
         self.setPen(QPen(Qt.GlobalColor.black))  # Outline of the source
         self.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsMovable | 
                       QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
 
-        self.name = name
-        self.voltage = voltage
-        self.lines = []  # Store connected lines
-
         # Create a text item for the source's name and voltage
         self.text_item = QGraphicsTextItem(f"{self.name}: {self.voltage} p.u.", self)
         self.text_item.setPos(-10, -25)  # Position of the text above the source
@@ -26,9 +31,28 @@ class Source(QGraphicsEllipseItem):
                                            self.voltage, 0, 10, 2)
         
         if ok:
-            self.voltage = value
-            # Update the text display to reflect the new voltage value
-            self.text_item.setPlainText(f"{self.name}: {self.voltage} p.u.")
+            self.scene().edit(self, "voltage", value)
+
+    @property
+    def power(self):
+        """ Forecast/dispatched output (MW), None until set by the overlay """
+        power = self.model.power[self.index]
+        return None if np.isnan(power) else float(power)
+
+    @power.setter
+    def power(self, value):
+        self.model.power[self.index] = np.nan if value is None else value
+
+    def refresh_text(self):
+        """ Update the text display to reflect the current voltage value """
+        self.text_item.setPlainText(f"{self.name}: {self.voltage} p.u.")
+
+    def set_power(self, value):
+        """ Set the dispatched output, touching the text item only if the label changes """
+        self.power = value
+        text = f"{self.name}: {value:.1f} MW"
+        if self.text_item.toPlainText() != text:
+            self.text_item.setPlainText(text)
     
     def mouseMoveEvent(self, event):
         """ Update any connected items (like lines or buses) when the source is moved """
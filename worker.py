@@ -0,0 +1,262 @@
+import os
+import itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+ALIGN = 64  # Byte alignment of each array inside a shared result block
+
+
+class WorkerState:
+    """
+    State kept warm inside the worker process between jobs.
+
+    Forecast models, the network model and its factorised susceptance
+    matrix are loaded on first use and reused by every later job; the
+    network is only rebuilt when a job names a different snapshot file or
+    that file changed on disk.
+    """
+
+    def __init__(self):
+        self.models = None
+        self.network_key = None
+        self.model = None
+        self.dc_network = None
+        self.blocks = {}  # job id -> SharedMemory still referenced by the GUI
+
+    def forecast_models(self):
+        if self.models is None:
+            import models  # Unpickles every forecast model once
+            self.models = models
+        return self.models
+
+    def network(self, path=None):
+        from power_flow import DCNetwork
+        key = (path, os.path.getmtime(path)) if path else None
+        if self.model is None or key != self.network_key:
+            if path:
+                from scene_io import read_snapshot
+                self.model = read_snapshot(path)[0]
+            else:
+                from network_model import NetworkModel
+                from sld_data import bus_data, line_data, source_data, load_data
+                self.model = NetworkModel.from_sld_data(bus_data, source_data, load_data, line_data)
+            self.dc_network = DCNetwork(self.model)
+            self.network_key = key
+        return self.model, self.dc_network
+
+    def publish(self, job_id, arrays):
+        """
+        Copy result arrays into one shared memory block.
+
+        Returns:
+        - dict: Block name and (offset, shape, dtype) of each array.
+        """
+        layout, size = {}, 0
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            size = -(-size // ALIGN) * ALIGN
+            layout[key] = (size, array.shape, array.dtype.str)
+            size += array.nbytes
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for key, array in arrays.items():
+            offset, shape, dtype = layout[key]
+            np.ndarray(shape, dtype, buffer=block.buf, offset=offset)[...] = array
+        self.blocks[job_id] = block
+        return {"shm": block.name, "arrays": layout}
+
+    def release(self, job_id):
+        block = self.blocks.pop(job_id, None)
+        if block is not None:
+            block.close()
+            block.unlink()
+
+
+def horizon_job(state, params, progress):
+    """ Forecast the horizon, solve line flows and the probabilistic study """
+    from process_data import process_data_load, process_data_generation, is_solar
+    from power_flow import dispatch
+    from probabilistic_flow import exceedance_probability
+
+    progress("Preparing forecast features...")
+    load_data = process_data_load(params["start"], params["hours"])
+    generation_data = process_data_generation(params["start"], params["hours"])
+
+    progress("Forecasting load and generation...")
+    models = state.forecast_models()
+    key = params["model_key"]
+    load = models.predict_load(f"load_{key}", load_data)
+    wind = models.predict_generation(f"gen_{key}", generation_data)
+    solar = models.predict_generation(f"gen_{key}", is_solar(generation_data))
+    if load is None or wind is None or solar is None:
+        raise RuntimeError("Forecasting failed, see console for details")
+
+    progress("Solving line flows...")
+    model, network = state.network(params.get("network_path"))
+    load_values, source_values = dispatch(model, load, solar, wind)
+    line_flows = network.flows(network.injections(source_values) - network.injections(load_values))
+
+    progress("Running probabilistic power flow...")
+    line_risk = exceedance_probability(model, load, solar, wind, network=network)
+
+    return {"load": load, "solar": solar, "wind": wind, "line_flows": line_flows,
+            "line_risk": line_risk, "branches": network.branches}
+
+
+def fault_job(state, params, progress):
+    """ Three-phase fault levels at every bus of the network sent by the GUI """
+    from fault_analysis import fault_levels
+
+    progress("Solving fault levels...")
+    nodes, _, current, level = fault_levels(params["model"])
+    return {"nodes": nodes, "current": current, "level": level}
+
+
+JOBS = {"horizon": horizon_job, "fault_levels": fault_job}
+
+
+def worker_main(conn):
+    """
+    Worker process loop.
+
+    Messages from the GUI are (kind, job_id, params) tuples, ("release",
+    job_id, None) to free a result block, or None to stop. Replies are
+    ("progress", job_id, text), ("done", job_id, layout) or ("error",
+    job_id, text).
+    """
+    state = WorkerState()
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        kind, job_id, params = message
+        if kind == "release":
+            state.release(job_id)
+            continue
+        try:
+            arrays = JOBS[kind](state, params, lambda text: conn.send(("progress", job_id, text)))
+            conn.send(("done", job_id, state.publish(job_id, arrays)))
+        except Exception as e:
+            conn.send(("error", job_id, f"{type(e).__name__}: {e}"))
+
+    for job_id in list(state.blocks):
+        state.release(job_id)
+
+
+def attach_block(name):
+    """
+    Attach to a worker-owned block.
+
+    The spawned worker shares this process's resource tracker, so attaching
+    on Python < 3.13 only repeats the worker's registration; the worker
+    stays responsible for unlinking.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class WorkerResult:
+    """
+    Result arrays viewed directly in the worker's shared memory block.
+
+    Arrays are zero-copy views, so they are only valid until release(); copy
+    anything that must outlive the result.
+    """
+
+    def __init__(self, client, job_id, layout):
+        self.client = client
+        self.job_id = job_id
+        self.block = attach_block(layout["shm"])
+        self.arrays = {key: np.ndarray(tuple(shape), np.dtype(dtype), buffer=self.block.buf, offset=offset)
+                       for key, (offset, shape, dtype) in layout["arrays"].items()}
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def release(self):
+        if self.block is not None:
+            self.arrays = {}
+            self.block.close()
+            self.block = None
+            if self.client.is_alive():  # A dead worker's blocks are cleaned up by the resource tracker
+                self.client.send(("release", self.job_id, None))
+
+
+class OptimizationWorker(QObject):
+    """
+    GUI-side handle of a long-lived analysis process.
+
+    The process is spawned once and keeps forecast models and the network
+    warm; jobs are sent over a local pipe, progress text is streamed back and
+    results arrive as shared memory views instead of pickled arrays.
+    """
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(object)  # WorkerResult
+    failed = pyqtSignal(str)
+
+    POLL_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        context = mp.get_context("spawn")  # Never fork a process running Qt
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job_ids = itertools.count(1)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.POLL_MS)
+        self.timer.timeout.connect(self.poll)
+        self.timer.start()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def send(self, message):
+        """ Send a message, reporting through failed if the worker has gone """
+        try:
+            if not self.process.is_alive():
+                raise BrokenPipeError("worker process is not running")
+            self.conn.send(message)
+            return True
+        except OSError as e:
+            self.timer.stop()
+            self.failed.emit(f"Worker process exited ({e})")
+            return False
+
+    def submit(self, kind, **params):
+        """ Queue a job, returns its id or None if the worker has exited """
+        job_id = next(self.job_ids)
+        return job_id if self.send((kind, job_id, params)) else None
+
+    def poll(self):
+        """ Drain replies without blocking the event loop """
+        try:
+            while self.conn.poll():
+                event, job_id, payload = self.conn.recv()
+                if event == "progress":
+                    self.progress.emit(payload)
+                elif event == "done":
+                    self.finished.emit(WorkerResult(self, job_id, payload))
+                else:
+                    self.failed.emit(payload)
+        except (EOFError, OSError):
+            # EOFError on a clean close, ConnectionResetError and friends when the child was killed
+            self.timer.stop()
+            self.failed.emit("Worker process exited")
+
+    def shutdown(self):
+        self.timer.stop()
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()